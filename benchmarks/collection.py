@@ -0,0 +1,234 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# Measure App.get_info, ConsoleApp.prettify_message and App.save_info on
+# generated Linux hosts, with a fake procfs, sysfs and /dev below a temporary
+# root and a fake netifaces module. Results are written as JSON, and the run
+# fails when a result is slower or larger than the baseline by more than the
+# threshold.
+#
+#   $ python benchmarks/collection.py --output baseline.json
+#   $ python benchmarks/collection.py --baseline baseline.json --threshold 0.2
+
+# standard library
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+# third party library
+import click
+
+PROJECT = Path(__file__).resolve().parent.parent
+# (interfaces, disks) of the generated hosts
+CASES = [(1, 1), (100, 20), (1000, 100), (10000, 200)]
+
+
+def make_root(root, disks):
+    # a disk per nvme<i>n1 and a partition on the first one, mounted on '/'
+    # with the device number of the temporary root, which is what stat sees
+    st_dev = os.stat(root).st_dev
+    major, minor = os.major(st_dev), os.minor(st_dev)
+    write(
+        root,
+        "proc/self/mountinfo",
+        f"22 1 {major}:{minor} / / rw,relatime shared:1 - ext4 "
+        "/dev/nvme0n1p1 rw\n",
+    )
+    for i in range(disks):
+        name = f"nvme{i}n1"
+        device = f"sys/devices/block/{name}"
+        write(root, f"{device}/device/model", "Fake NVMe Disk\n")
+        write(root, f"{device}/serial", f"FAKE{i:08d}\n")
+        write(root, f"{device}/wwid", f"eui.{i:016x}\n")
+        write(root, f"{device}/size", "1953525168\n")
+        write(root, f"{device}/queue/rotational", "0\n")
+        link(root, f"sys/block/{name}", f"../devices/block/{name}")
+        link(root, f"sys/class/block/{name}", f"../../devices/block/{name}")
+        link(
+            root,
+            f"dev/disk/by-id/nvme-Fake_NVMe_Disk_FAKE{i:08d}",
+            f"../../{name}",
+        )
+    partition = "sys/devices/block/nvme0n1/nvme0n1p1"
+    write(root, f"{partition}/partition", "1\n")
+    link(
+        root,
+        "sys/class/block/nvme0n1p1",
+        "../../devices/block/nvme0n1/nvme0n1p1",
+    )
+    link(
+        root,
+        f"sys/dev/block/{major}:{minor}",
+        "../../devices/block/nvme0n1/nvme0n1p1",
+    )
+
+
+def write(root, path, data):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fout:
+        fout.write(data)
+
+
+def link(root, path, target):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.symlink(target, path)
+
+
+def make_netifaces(interfaces):
+    # the subset of the netifaces module that the collector uses
+    addresses = {"lo": {2: [{"addr": "127.0.0.1"}], 17: [{"addr": ""}]}}
+    for i in range(interfaces):
+        addresses[f"eth{i}"] = {
+            2: [{"addr": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"}],
+            17: [
+                {
+                    "addr": f"02:00:00:{i >> 16 & 255:02x}:"
+                    f"{i >> 8 & 255:02x}:{i & 255:02x}"
+                }
+            ],
+        }
+    return SimpleNamespace(
+        AF_INET=2,
+        AF_LINK=17,
+        interfaces=lambda: list(addresses),
+        ifaddresses=addresses.__getitem__,
+    )
+
+
+def measure(function, repeat):
+    # best time of the repetitions and peak memory of one call
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": min(seconds), "peak_bytes": peak}
+
+
+def run_case(interfaces, disks, repeat):
+    # local library
+    from console_app import ConsoleApp
+    from linux import system_info
+    from main import App, get_path
+
+    with tempfile.TemporaryDirectory() as root:
+        make_root(root, disks)
+        system_info.configure(root, make_netifaces(interfaces))
+        try:
+            my_app = App(get_path())
+            console_app = ConsoleApp(my_app, None)
+            output = os.path.join(root, "output.json")
+            return {
+                "get_info": measure(my_app.get_info, repeat),
+                "prettify_message": measure(
+                    console_app.prettify_message, repeat
+                ),
+                "save_info": measure(
+                    lambda: my_app.save_info(console_app.system_info, output),
+                    repeat,
+                ),
+            }
+        finally:
+            system_info.configure()
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for case, functions in results.items():
+        for function, metrics in functions.items():
+            for metric, value in metrics.items():
+                try:
+                    before = baseline[case][function][metric]
+                except KeyError:
+                    continue
+                if before and value > before * (1 + threshold):
+                    regressions.append(
+                        f"{case} {function} {metric}: {before:.6g} -> "
+                        f"{value:.6g} (+{(value / before - 1) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def parse_case(ctx, param, values):
+    try:
+        return [
+            tuple(int(count) for count in value.split("x"))
+            for value in values
+        ]
+    except ValueError:
+        raise click.BadParameter("Use <interfaces>x<disks>, e.g. 1000x100.")
+
+
+@click.command()
+@click.option(
+    "--case",
+    "cases",
+    multiple=True,
+    callback=parse_case,
+    help="Host to generate as <interfaces>x<disks>, repeatable.",
+)
+@click.option("--repeat", default=5, help="Number of repetitions.")
+@click.option("--output", help="Path to write the results as JSON.")
+@click.option("--baseline", help="Path to results to compare with.")
+@click.option(
+    "--threshold",
+    default=0.2,
+    show_default=True,
+    help="Allowed slowdown or growth over the baseline, as a fraction.",
+)
+def main(cases, repeat, output, baseline, threshold):
+    sys.path.insert(0, str(PROJECT))
+
+    results = {}
+    for interfaces, disks in cases or CASES:
+        case = f"{interfaces}x{disks}"
+        results[case] = run_case(interfaces, disks, repeat)
+        for function, metrics in results[case].items():
+            print(
+                f"{interfaces:>6} interfaces {disks:>4} disks  "
+                f"{function:<17} {metrics['seconds'] * 1000:10.3f} ms "
+                f"{metrics['peak_bytes'] / 1024:10.0f} KiB"
+            )
+
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as fout:
+            json.dump(results, fout, indent=2)
+
+    if baseline is not None:
+        with open(baseline, encoding="utf-8") as fin:
+            regressions = compare(results, json.load(fin), threshold)
+        for regression in regressions:
+            print("Regression: " + regression, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# Compare the netlink and netifaces backends of linux/system_info with
+# dummy interfaces created in a network namespace. Requires root and
+# iproute2.
+#
+#   $ sudo python benchmarks/network_backends.py
+
+# standard library
+import json
+import subprocess
+import sys
+import timeit
+from pathlib import Path
+
+# third party library
+import click
+
+PROJECT = Path(__file__).resolve().parent.parent
+NAMESPACE = "xincapio-bench"
+
+
+def create_namespace(count):
+    subprocess.run(["ip", "netns", "add", NAMESPACE], check=True)
+    commands = []
+    for i in range(count):
+        name = f"dummy{i}"
+        ip = f"10.{i // 65536}.{i // 256 % 256}.{i % 256}"
+        commands.append(f"link add {name} type dummy")
+        commands.append(f"addr add {ip}/32 dev {name}")
+        commands.append(f"link set {name} up")
+    subprocess.run(
+        ["ip", "-n", NAMESPACE, "-batch", "-"],
+        input="\n".join(commands) + "\n",
+        encoding="utf-8",
+        check=True,
+    )
+
+
+def delete_namespace():
+    subprocess.run(["ip", "netns", "delete", NAMESPACE], check=False)
+
+
+def measure(repeat):
+    sys.path.insert(0, str(PROJECT))
+    # local library
+    from linux import netlink, system_info
+
+    backends = {
+        "netlink": netlink.get_network_info,
+        "netifaces": lambda: system_info._get_network_info_netifaces(
+            system_info.ni
+        ),
+    }
+    result = {}
+    for name, function in backends.items():
+        timer = timeit.Timer(function)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=number)) / number
+        result[name] = {
+            "seconds": best,
+            "interfaces": len(function()),
+        }
+    return result
+
+
+@click.command()
+@click.option("--count", "counts", multiple=True, type=int)
+@click.option("--repeat", default=5, help="Number of repetitions.")
+@click.option("--measure", "measure_only", is_flag=True, hidden=True)
+def main(counts, repeat, measure_only):
+    if measure_only:
+        print(json.dumps(measure(repeat)))
+        return
+
+    results = {}
+    for count in counts or (10, 1000, 10000):
+        delete_namespace()
+        create_namespace(count)
+        try:
+            out = subprocess.run(
+                [
+                    "ip",
+                    "netns",
+                    "exec",
+                    NAMESPACE,
+                    sys.executable,
+                    __file__,
+                    "--measure",
+                    "--repeat",
+                    str(repeat),
+                ],
+                stdout=subprocess.PIPE,
+                check=True,
+            ).stdout
+        finally:
+            delete_namespace()
+        results[count] = json.loads(out)
+        for name, result in results[count].items():
+            print(
+                f"{count:>6} interfaces  {name:<10} "
+                f"{result['seconds'] * 1000:10.3f} ms"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# Compare memory per snapshot and construction time of the record classes
+# with plain dictionaries.
+#
+#   $ python benchmarks/records.py --count 100000 --interfaces 4
+
+# standard library
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# third party library
+import click
+
+PROJECT = Path(__file__).resolve().parent.parent
+
+
+def make_snapshot(i, interfaces):
+    return {
+        "os": "Linux",
+        "creation_time": f"2026-01-01T00:00:00.{i % 1000000:06d}Z",
+        "network": [
+            {
+                "name": f"eth{j}",
+                "ip": f"10.{j}.{i // 256 % 256}.{i % 256}",
+                "mac": f"02:00:{j:02x}:{i >> 16 & 255:02x}:"
+                f"{i >> 8 & 255:02x}:{i & 255:02x}",
+            }
+            for j in range(interfaces)
+        ],
+        "boot_disk": {"mount_point": "/dev/sda1", "serial_number": f"S{i}"},
+    }
+
+
+def measure(build, lines):
+    tracemalloc.start()
+    start = time.perf_counter()
+    # records are built from freshly parsed JSON, as the fleet tools do
+    records = [build(json.loads(line)) for line in lines]
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return size / len(lines), seconds / len(lines)
+
+
+@click.command()
+@click.option("--count", default=100000, help="Number of snapshots.")
+@click.option("--interfaces", default=4, help="Interfaces per snapshot.")
+def main(count, interfaces):
+    sys.path.insert(0, str(PROJECT))
+    # local library
+    from records import Snapshot
+
+    lines = [
+        json.dumps(make_snapshot(i, interfaces)) for i in range(count)
+    ]
+    forms = {
+        "dict": lambda system_info: system_info,
+        "slots": Snapshot.from_dict,
+        "slots packed": lambda system_info: Snapshot.from_dict(
+            system_info, packed=True
+        ),
+    }
+    results = {}
+    for name, build in forms.items():
+        size, seconds = measure(build, lines)
+        results[name] = {"bytes": size, "seconds": seconds}
+        print(
+            f"{name:<14} {size:10.0f} bytes/record "
+            f"{seconds * 1e6:10.2f} us/record"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    main()
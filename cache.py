@@ -0,0 +1,148 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+try:
+    # standard library
+    import fcntl
+except ImportError:
+    # standard library
+    import msvcrt
+
+    fcntl = None
+
+BOOT_ID = Path("/proc/sys/kernel/random/boot_id")
+
+
+class FactCache:
+    def __init__(self, directory=None, ttl=60.0, refresh=False):
+        if directory is None:
+            directory = get_default_directory()
+        self.directory = Path(directory)
+        self.path = self.directory / "facts.json"
+        self.lock_path = self.directory / "facts.lock"
+        self.ttl = ttl
+        self.refresh = refresh
+        self.boot_id = _read_boot_id()
+
+    def fetch_static(self, name, key, function):
+        # static facts stay valid until reboot or until the key changes; they
+        # are not cached where the boot cannot be identified
+        if self.boot_id is None:
+            return function()
+        return self._fetch(name, [self.boot_id, key], None, function)
+
+    def fetch_volatile(self, name, function):
+        return self._fetch(name, [self.boot_id], self.ttl, function)
+
+    def _fetch(self, name, key, ttl, function):
+        now = time.time()
+        if not self.refresh:
+            entry = self._load().get(name)
+            if (
+                entry is not None
+                and entry["key"] == key
+                and (ttl is None or now - entry["time"] < ttl)
+            ):
+                return entry["value"]
+
+        value = function()
+        try:
+            self._store(name, {"key": key, "time": now, "value": value})
+        except OSError:
+            # a read-only or full cache directory must not break collection
+            pass
+        return value
+
+    def _load(self):
+        try:
+            with _Lock(self.lock_path, exclusive=False):
+                with open(self.path, encoding="utf-8") as fin:
+                    return json.load(fin)
+        except (OSError, ValueError):
+            return {}
+
+    def _store(self, name, entry):
+        if not self.directory.exists():
+            Path.mkdir(self.directory, parents=True)
+        with _Lock(self.lock_path, exclusive=True):
+            try:
+                with open(self.path, encoding="utf-8") as fin:
+                    entries = json.load(fin)
+            except (OSError, ValueError):
+                entries = {}
+            entries[name] = entry
+            # replace the file atomically, so readers never see a partial one
+            temp_path = self.path.with_name(
+                f".facts.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with open(temp_path, "wt", encoding="utf-8") as fout:
+                fout.write(json.dumps(entries))
+            os.replace(temp_path, self.path)
+
+
+class _Lock:
+    def __init__(self, path, exclusive):
+        self.path = path
+        self.exclusive = exclusive
+        self.fd = None
+
+    def __enter__(self):
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(
+                self.fd, fcntl.LOCK_EX if self.exclusive else fcntl.LOCK_SH
+            )
+        else:
+            # msvcrt has no shared locks
+            msvcrt.locking(self.fd, msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if fcntl is None:
+            os.lseek(self.fd, 0, os.SEEK_SET)
+            msvcrt.locking(self.fd, msvcrt.LK_UNLCK, 1)
+        os.close(self.fd)
+
+
+def get_default_directory():
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA", Path.home() / "AppData/Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")
+    return Path(base) / "xincapio"
+
+
+def get_device_key(path):
+    st_dev = os.stat(path).st_dev
+    if os.name == "nt":
+        return st_dev
+    return [os.major(st_dev), os.minor(st_dev)]
+
+
+def _read_boot_id():
+    try:
+        return BOOT_ID.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
@@ -0,0 +1,58 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# third party library
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class CollectSignals(QObject):
+    # every signal carries the generation of the refresh, so that the widget
+    # can drop what arrives from a refresh that was superseded
+    result = pyqtSignal(int, str, object)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+class CollectWorker(QRunnable):
+    def __init__(self, my_app, generation):
+        super().__init__()
+        self.my_app = my_app
+        self.generation = generation
+        self.cancelled = False
+        self.signals = CollectSignals()
+
+    def cancel(self):
+        # collectors cannot be interrupted, but a cancelled worker stops
+        # emitting so the stale refresh is not rendered
+        self.cancelled = True
+
+    def run(self):
+        try:
+            system_info = self.my_app.get_info(on_result=self.on_result)
+        except Exception as error:
+            if not self.cancelled:
+                self.signals.failed.emit(
+                    self.generation, str(error) or type(error).__name__
+                )
+            return
+        if not self.cancelled:
+            self.signals.finished.emit(self.generation, system_info)
+
+    def on_result(self, name, value):
+        if not self.cancelled:
+            self.signals.result.emit(self.generation, name, value)
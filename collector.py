@@ -0,0 +1,266 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import importlib
+import json
+import os
+import queue
+import signal
+import threading
+import time
+
+# local library
+import profiler
+
+# modules which register collectors for each platform, new collectors are
+# added by registering them in one of these modules or appending a module
+COLLECTOR_MODULES = {
+    "Linux": ["linux.system_info"],
+    "Windows": ["windows.system_info"],
+}
+
+_collectors = {}
+
+
+class Collector:
+    def __init__(
+        self,
+        name,
+        function,
+        platforms,
+        depends,
+        cache,
+        cache_key,
+        timeout,
+        isolate,
+    ):
+        self.name = name
+        self.function = function
+        self.platforms = platforms
+        self.depends = depends
+        self.cache = cache
+        self.cache_key = cache_key
+        self.timeout = timeout
+        self.isolate = isolate
+
+    def run(self, results, cache=None, task=None):
+        kwargs = {name: results[name] for name in self.depends}
+        if self.isolate and task is not None and hasattr(os, "fork"):
+            function = lambda: _call_isolated(task, self.function, kwargs)
+        else:
+            function = lambda: self.function(**kwargs)
+
+        if cache is None or self.cache is None:
+            return function()
+        if self.cache == "static":
+            return cache.fetch_static(self.name, self.cache_key(), function)
+        return cache.fetch_volatile(self.name, function)
+
+
+class Task:
+    def __init__(self, collector, timeout):
+        self.collector = collector
+        self.deadline = None
+        if timeout is not None:
+            self.deadline = time.monotonic() + timeout
+        self.pid = None
+        self.value = None
+        self.error = None
+
+    def start(self, results, cache, done):
+        # daemon threads, so that a probe which never returns cannot keep the
+        # program from exiting
+        thread = threading.Thread(
+            target=self.run, args=(results, cache, done), daemon=True
+        )
+        thread.start()
+
+    def run(self, results, cache, done):
+        try:
+            with profiler.span(self.collector.name, "collector"):
+                self.value = self.collector.run(results, cache, self)
+        except Exception as error:
+            self.error = str(error) or type(error).__name__
+        done.put(self)
+
+    def kill(self):
+        pid = self.pid
+        if pid is not None:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+
+def register(
+    name,
+    platforms,
+    depends=(),
+    cache=None,
+    cache_key=None,
+    timeout=None,
+    isolate=False,
+):
+    # cache is None, "static" for facts which only change on reboot, keyed
+    # by the result of cache_key(), or "volatile" for facts with a ttl.
+    # isolate runs the collector in a child process which is killed when it
+    # misses its deadline, for probes that can block in the kernel
+    def decorator(function):
+        _collectors[name] = Collector(
+            name,
+            function,
+            tuple(platforms),
+            tuple(depends),
+            cache,
+            cache_key,
+            timeout,
+            isolate,
+        )
+        return function
+
+    return decorator
+
+
+def get_collectors(platform):
+    with profiler.span("import collectors"):
+        for module in COLLECTOR_MODULES.get(platform, []):
+            importlib.import_module(module)
+    return [
+        collector
+        for collector in _collectors.values()
+        if platform in collector.platforms
+    ]
+
+
+def collect(platform, cache=None, timeout=None, on_result=None):
+    # on_result(name, value) is called as each collector finishes, from the
+    # thread that called collect
+    collectors = get_collectors(platform)
+    names = {collector.name for collector in collectors}
+    for collector in collectors:
+        missing = set(collector.depends) - names
+        if missing:
+            raise RuntimeError(
+                f"Collector '{collector.name}' depends on unknown "
+                f"collectors {sorted(missing)}."
+            )
+
+    deadline = None
+    if timeout is not None:
+        deadline = time.monotonic() + timeout
+    results = {}
+    errors = {}
+    timed_out = []
+    pending = list(collectors)
+    running = []
+    done = queue.Queue()
+    while pending or running:
+        # start every collector whose dependencies are done
+        for collector in list(pending):
+            failed = [
+                name
+                for name in collector.depends
+                if name in errors or name in timed_out
+            ]
+            if failed:
+                pending.remove(collector)
+                errors[collector.name] = (
+                    f"Depends on failed collector '{failed[0]}'."
+                )
+            elif all(name in results for name in collector.depends):
+                pending.remove(collector)
+                task = Task(collector, collector.timeout)
+                task.start(results, cache, done)
+                running.append(task)
+        if not running:
+            if pending:
+                raise RuntimeError("Collectors have circular dependencies.")
+            break
+
+        deadlines = [task.deadline for task in running if task.deadline]
+        if deadline is not None:
+            deadlines.append(deadline)
+        wait = None
+        if deadlines:
+            wait = max(min(deadlines) - time.monotonic(), 0)
+        try:
+            task = done.get(timeout=wait)
+        except queue.Empty:
+            now = time.monotonic()
+            expired = deadline is not None and now >= deadline
+            for task in list(running):
+                if expired or (task.deadline and now >= task.deadline):
+                    running.remove(task)
+                    task.kill()
+                    timed_out.append(task.collector.name)
+            if expired:
+                timed_out.extend(collector.name for collector in pending)
+                pending = []
+            continue
+
+        if task not in running:
+            # finished after it was abandoned
+            continue
+        running.remove(task)
+        if task.error is None:
+            results[task.collector.name] = task.value
+            if on_result is not None:
+                on_result(task.collector.name, task.value)
+        else:
+            errors[task.collector.name] = task.error
+
+    # keep the order of registration in the output
+    results = {
+        collector.name: results[collector.name]
+        for collector in collectors
+        if collector.name in results
+    }
+    return results, errors, timed_out
+
+
+def _call_isolated(task, function, kwargs):
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # the child must never return into the caller's stack, whatever
+        # happens, or it would go on running the parent's code
+        try:
+            os.close(read_fd)
+            try:
+                data = json.dumps({"value": function(**kwargs)})
+            except BaseException as error:
+                message = str(error) or type(error).__name__
+                data = json.dumps({"error": message})
+            with open(write_fd, "wb") as fout:
+                fout.write(data.encode("utf-8"))
+        finally:
+            os._exit(0)
+
+    task.pid = pid
+    os.close(write_fd)
+    with open(read_fd, "rb") as fin:
+        data = fin.read()
+    os.waitpid(pid, 0)
+    task.pid = None
+    if not data:
+        raise RuntimeError("Probe was killed.")
+    reply = json.loads(data)
+    if "error" in reply:
+        raise RuntimeError(reply["error"])
+    return reply["value"]
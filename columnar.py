@@ -0,0 +1,183 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import calendar
+import sys
+from array import array
+from pathlib import Path
+
+# local library
+import dataset
+from subnets import pack_address
+
+# the header is written with room for the final shape and rewritten once the
+# number of rows is known; 10 bytes of preamble plus this is a multiple of 64
+# as the .npy format recommends
+HEADER_SIZE = 118
+BYTE_ORDER = "<" if sys.byteorder == "little" else ">"
+# rows kept in memory per column before they are written
+BUFFER_ROWS = 1 << 16
+
+
+class NpyWriter:
+    # writes a .npy file (format version 1.0) that numpy.load can memory-map
+    def __init__(self, path, typecode, descr, row_shape=()):
+        self.fout = open(path, "wb")
+        self.descr = descr
+        self.row_shape = row_shape
+        self.rows = 0
+        self.buffer = array(typecode)
+        self.fout.write(self._header())
+
+    def append(self, value):
+        self.buffer.append(value)
+        if len(self.buffer) >= BUFFER_ROWS:
+            self.flush()
+
+    def extend(self, values):
+        self.buffer.extend(values)
+        if len(self.buffer) >= BUFFER_ROWS:
+            self.flush()
+
+    def flush(self):
+        self.buffer.tofile(self.fout)
+        del self.buffer[:]
+
+    def close(self, rows):
+        self.flush()
+        self.rows = rows
+        self.fout.seek(0)
+        self.fout.write(self._header())
+        self.fout.close()
+
+    def _header(self):
+        shape = (self.rows,) + self.row_shape
+        header = (
+            f"{{'descr': '{self.descr}', 'fortran_order': False, "
+            f"'shape': {shape}, }}"
+        )
+        header = header.ljust(HEADER_SIZE - 1) + "\n"
+        if len(header) != HEADER_SIZE:
+            raise ValueError("Shape does not fit in the .npy header.")
+        preamble = b"\x93NUMPY\x01\x00" + HEADER_SIZE.to_bytes(2, "little")
+        return preamble + header.encode("latin-1")
+
+
+class Dictionary:
+    def __init__(self):
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    def write(self, path):
+        values = [value.encode("utf-8") for value in self.codes]
+        width = max((len(value) for value in values), default=1) or 1
+        writer = NpyWriter(path, "B", f"|S{width}")
+        for value in values:
+            writer.extend(value.ljust(width, b"\0"))
+        writer.close(len(values))
+
+
+def export(inputs, directory):
+    # hosts have one row in os, creation_time and serial_number, and their
+    # interfaces are the rows interface_offsets[i]:interface_offsets[i + 1]
+    # of the interface_* columns
+    directory = Path(directory)
+    if not directory.exists():
+        Path.mkdir(directory, parents=True)
+
+    def column(name, typecode, descr, row_shape=()):
+        return NpyWriter(
+            directory / f"{name}.npy", typecode, descr, row_shape
+        )
+
+    os_codes = Dictionary()
+    serial_codes = Dictionary()
+    name_codes = Dictionary()
+    columns = {
+        "os": column("os", "B", "|u1"),
+        "creation_time": column("creation_time", "q", BYTE_ORDER + "i8"),
+        "serial_number": column("serial_number", "q", BYTE_ORDER + "i8"),
+        "interface_offsets": column(
+            "interface_offsets", "q", BYTE_ORDER + "i8"
+        ),
+        "interface_name": column("interface_name", "I", BYTE_ORDER + "u4"),
+        "interface_mac": column("interface_mac", "B", "|u1", (6,)),
+        "interface_ip": column("interface_ip", "B", "|u1", (16,)),
+        "interface_ip_version": column("interface_ip_version", "B", "|u1"),
+    }
+    hosts = 0
+    interfaces = 0
+    columns["interface_offsets"].append(0)
+    for _, _, snapshot in dataset.iter_valid_records(inputs):
+        time = dataset.parse_creation_time(snapshot)
+        columns["os"].append(os_codes.encode(snapshot["os"]))
+        columns["creation_time"].append(
+            calendar.timegm(time.timetuple()) * 1000000 + time.microsecond
+        )
+        serial_number = dataset.get_serial_number(snapshot)
+        columns["serial_number"].append(
+            serial_codes.encode(serial_number) if serial_number else -1
+        )
+        for network in snapshot.get("network") or []:
+            columns["interface_name"].append(
+                name_codes.encode(network["name"])
+            )
+            columns["interface_mac"].extend(_pack_mac(network["mac"]))
+            version, ip = _pack_ip(network["ip"])
+            columns["interface_ip"].extend(ip)
+            columns["interface_ip_version"].append(version)
+            interfaces += 1
+        columns["interface_offsets"].append(interfaces)
+        hosts += 1
+
+    for name, writer in columns.items():
+        if name == "interface_offsets":
+            writer.close(hosts + 1)
+        elif name.startswith("interface_"):
+            writer.close(interfaces)
+        else:
+            writer.close(hosts)
+    os_codes.write(directory / "os_values.npy")
+    serial_codes.write(directory / "serial_number_values.npy")
+    name_codes.write(directory / "interface_name_values.npy")
+    return hosts, interfaces
+
+
+def _pack_mac(mac):
+    try:
+        packed = bytes.fromhex(mac.replace(":", "").replace("-", ""))
+    except ValueError:
+        packed = b""
+    return packed if len(packed) == 6 else bytes(6)
+
+
+def _pack_ip(ip):
+    # IPv4 addresses are stored as IPv4-mapped IPv6 addresses
+    try:
+        version, address = pack_address(ip)
+    except (OSError, ValueError):
+        return 0, bytes(16)
+    if version == 4:
+        address |= 0xFFFF << 32
+    return version, address.to_bytes(16, "big")
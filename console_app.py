@@ -18,17 +18,29 @@
 # standard library
 from pathlib import Path
 
+# local library
+import profiler
+
 
 class ConsoleApp:
-    def __init__(self, my_app, output):
+    def __init__(
+        self, my_app, output, store=None, host=None, yes=False, history=None
+    ):
         self.my_app = my_app
         self.output = output
+        self.store = store
+        self.host = host
+        self.yes = yes
+        self.history = history
         self.system_info = self.my_app.get_info()
 
     def prettify_message(self):
         os = self.system_info["os"]
-        networks = self.system_info["network"]
-        boot_disk = self.system_info["boot_disk"]
+        networks = self.system_info.get("network", [])
+        boot_disk = self.system_info.get("boot_disk")
+        errors = self.system_info.get("errors", {})
+        timed_out = self.system_info.get("timed_out", [])
+        disks = self.system_info.get("disks", [])
         message = ""
 
         message += "NETWORK\n\n"
@@ -36,10 +48,18 @@ class ConsoleApp:
             message += (
                 f"Name: {network['name']}\n"
                 f"IP: {network['ip']}\n"
-                f"MAC: {network['mac']}\n\n"
+                f"MAC: {network['mac']}\n"
             )
+            if "vendor" in network:
+                vendor = network["vendor"] or "Unknown"
+                if network["locally_administered"]:
+                    vendor += " (locally administered)"
+                message += f"Vendor: {vendor}\n"
+            message += "\n"
         message += "\nBOOT DISK\n\n"
-        if os == "Linux":
+        if boot_disk is None:
+            message += "Not available\n"
+        elif os == "Linux":
             message += (
                 f"Mount Point: {boot_disk['mount_point']}\n"
                 f"Serial Number: {boot_disk['serial_number']}\n"
@@ -50,10 +70,31 @@ class ConsoleApp:
                 f"Index: {boot_disk['index']}\n"
                 f"Serial Number: {boot_disk['serial_number']}\n"
             )
+        if disks:
+            message += "\nDISKS\n\n"
+        for disk in disks:
+            mount_points = ", ".join(disk.get("mount_points", []))
+            message += (
+                f"Name: {disk['name']}\n"
+                f"Serial Number: {disk['serial_number']}\n"
+                f"Model: {disk['model']}\n"
+                f"WWN: {disk['wwn']}\n"
+                f"Size: {disk['size']}\n"
+                f"Rotational: {disk['rotational']}\n"
+                f"Boot: {disk['boot']}\n"
+                f"Mount Points: {mount_points}\n\n"
+            )
+        if errors or timed_out:
+            message += "\nERRORS\n\n"
+            for name, error in errors.items():
+                message += f"{name}: {error}\n"
+            for name in timed_out:
+                message += f"{name}: Timed out\n"
         return message
 
     def run(self):
-        message = self.prettify_message()
+        with profiler.span("prettify_message"):
+            message = self.prettify_message()
         print(message)
 
         if self.output:
@@ -63,7 +104,15 @@ class ConsoleApp:
             else:
                 self.path_not_exists(output_path)
 
+        if self.store:
+            self.store.save(self.system_info, self.host)
+        if self.history:
+            self.history.append(self.system_info, self.host)
+
     def path_exists(self, output_path):
+        if self.yes:
+            self.my_app.save_info(self.system_info, output_path)
+            return
         overwrite = input(
             f"'{output_path}' already exsists. Do you want to overwrite [y/N]? "
         )
@@ -0,0 +1,156 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime as dt
+
+# local library
+from style import Style
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+SNAPSHOT_SUFFIXES = (".json",) + NDJSON_SUFFIXES
+
+# present on every host, so they do not identify one
+IGNORED_MACS = {"", "00:00:00:00:00:00"}
+
+
+def iter_paths(inputs):
+    # files are yielded as they are found, so huge directories are streamed
+    for path in inputs:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.endswith(SNAPSHOT_SUFFIXES):
+                        yield os.path.join(directory, name)
+        else:
+            yield path
+
+
+def iter_file(path, on_error=None):
+    # yield (offset, snapshot), where offset is that of the line in NDJSON
+    # files and 0 for a file holding a single snapshot. A line that is not
+    # JSON, e.g. the truncated last line of a crashed writer, is passed to
+    # on_error(offset, error) and skipped
+    if on_error is None:
+        on_error = lambda offset, error: print(
+            f"{path}: offset {offset}: {error}", file=sys.stderr
+        )
+    if path.endswith(NDJSON_SUFFIXES):
+        with open(path, "rb") as fin:
+            offset = 0
+            for line in fin:
+                if line.strip():
+                    try:
+                        snapshot = json.loads(line)
+                    except ValueError as error:
+                        on_error(offset, error)
+                    else:
+                        yield offset, snapshot
+                offset += len(line)
+    else:
+        with open(path, "rb") as fin:
+            data = fin.read()
+        try:
+            snapshot = json.loads(data)
+        except ValueError as error:
+            on_error(0, error)
+        else:
+            yield 0, snapshot
+
+
+def iter_records(inputs):
+    for path in iter_paths(inputs):
+        for offset, snapshot in iter_file(path):
+            yield path, offset, snapshot
+
+
+def iter_valid_records(inputs):
+    # invalid snapshots, lines that are not JSON and files that cannot be
+    # read are reported and skipped
+    for path in iter_paths(inputs):
+        try:
+            for offset, snapshot in iter_file(path):
+                try:
+                    validate(snapshot)
+                except ValueError as error:
+                    print(f"{path}: offset {offset}: {error}", file=sys.stderr)
+                    continue
+                yield path, offset, snapshot
+        except (OSError, ValueError) as error:
+            print(f"{path}: {error}", file=sys.stderr)
+
+
+def read_record(path, offset):
+    with open(path, "rb") as fin:
+        if path.endswith(NDJSON_SUFFIXES):
+            fin.seek(offset)
+            return json.loads(fin.readline())
+        return json.loads(fin.read())
+
+
+def get_macs(snapshot):
+    return sorted(
+        {
+            network["mac"].lower()
+            for network in snapshot.get("network") or []
+            if network["mac"] not in IGNORED_MACS
+        }
+    )
+
+
+def get_serial_number(snapshot):
+    boot_disk = snapshot.get("boot_disk") or {}
+    return boot_disk.get("serial_number") or ""
+
+
+def get_host_identity(snapshot):
+    # a host is identified by its boot disk serial number and its MACs
+    key = json.dumps([get_serial_number(snapshot), get_macs(snapshot)])
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def parse_creation_time(snapshot):
+    return dt.strptime(snapshot["creation_time"], Style.utc_datetime_fmt)
+
+
+def validate(snapshot):
+    if not isinstance(snapshot, dict):
+        raise ValueError("Snapshot is not an object.")
+    if snapshot.get("os") not in ("Linux", "Windows"):
+        raise ValueError(f"Unknown os {snapshot.get('os')!r}.")
+    try:
+        parse_creation_time(snapshot)
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Invalid creation_time.")
+    networks = snapshot.get("network", [])
+    if not isinstance(networks, list):
+        raise ValueError("network is not a list.")
+    for network in networks:
+        if not isinstance(network, dict) or not all(
+            isinstance(network.get(key), str) for key in ("name", "ip", "mac")
+        ):
+            raise ValueError("Invalid network interface.")
+    boot_disk = snapshot.get("boot_disk")
+    if boot_disk is not None and not isinstance(boot_disk, dict):
+        raise ValueError("boot_disk is not an object.")
+    if "network" not in snapshot and "boot_disk" not in snapshot:
+        raise ValueError("Snapshot has neither network nor boot_disk.")
@@ -0,0 +1,86 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import ipaddress
+import json
+import tempfile
+
+# local library
+import dataset
+from partition import Partitioner, iter_groups, iter_sorted
+
+
+def find_duplicates(
+    inputs, fout, partitions=64, max_bytes=64 << 20, temp=None
+):
+    count = 0
+    with tempfile.TemporaryDirectory(dir=temp) as directory:
+        partitioner = Partitioner(directory, partitions)
+        try:
+            for path, _, snapshot in dataset.iter_valid_records(inputs):
+                identity = dataset.get_host_identity(snapshot)
+                for kind, value in iter_keys(snapshot):
+                    key = f"{kind}:{value}"
+                    partitioner.write(key, f"{key}\t{identity}\t{path}\n")
+        finally:
+            partitioner.close()
+
+        for path in partitioner:
+            for key, rows in iter_groups(iter_sorted(path, max_bytes)):
+                # the same host usually appears in several snapshots
+                hosts = {}
+                for identity, source in rows:
+                    hosts.setdefault(identity, source)
+                if len(hosts) < 2:
+                    continue
+                kind, _, value = key.partition(":")
+                report = {
+                    "kind": kind,
+                    "value": value,
+                    "hosts": [
+                        {"identity": identity, "source": source}
+                        for identity, source in sorted(hosts.items())
+                    ],
+                }
+                fout.write(json.dumps(report) + "\n")
+                count += 1
+    return count
+
+
+def iter_keys(snapshot):
+    for network in snapshot.get("network") or []:
+        mac = network["mac"].lower()
+        if mac not in dataset.IGNORED_MACS:
+            yield "mac", mac
+        if _is_unique_ip(network["ip"]):
+            yield "ip", network["ip"]
+    serial_number = dataset.get_serial_number(snapshot)
+    if serial_number:
+        yield "serial", serial_number
+
+
+def _is_unique_ip(ip):
+    # loopback and link-local addresses repeat on every host by design
+    try:
+        address = ipaddress.ip_address(ip.split("%")[0])
+    except ValueError:
+        return False
+    return not (
+        address.is_loopback or address.is_link_local or address.is_unspecified
+    )
@@ -0,0 +1,96 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import json
+import tempfile
+
+# local library
+import dataset
+from history import flatten, format_path
+from partition import Partitioner, iter_groups, iter_sorted
+
+OLD = "0"
+NEW = "1"
+
+
+def diff(old, new, fout, partitions=64, max_bytes=64 << 20, temp=None):
+    # hash join: both sides are partitioned by host key, so each partition
+    # holds everything about its hosts and is compared on its own
+    counts = {"added": 0, "removed": 0, "changed": 0}
+    with tempfile.TemporaryDirectory(dir=temp) as directory:
+        partitioner = Partitioner(directory, partitions)
+        try:
+            for side, inputs in ((OLD, old), (NEW, new)):
+                for _, _, snapshot in dataset.iter_valid_records([inputs]):
+                    key = get_host_key(snapshot)
+                    line = json.dumps(snapshot, separators=(",", ":"))
+                    partitioner.write(key, f"{key}\t{side}\t{line}\n")
+        finally:
+            partitioner.close()
+
+        for path in partitioner:
+            for key, rows in iter_groups(iter_sorted(path, max_bytes)):
+                change = compare(key, rows)
+                if change is not None:
+                    counts[change["change"]] += 1
+                    fout.write(json.dumps(change) + "\n")
+    return counts
+
+
+def get_host_key(snapshot):
+    # the boot disk outlives network changes, so it identifies a host across
+    # runs; hosts without one fall back to their identity
+    serial_number = dataset.get_serial_number(snapshot)
+    if serial_number:
+        return "serial:" + serial_number
+    return "identity:" + dataset.get_host_identity(snapshot)
+
+
+def compare(key, rows):
+    newest = {}
+    for side, line in rows:
+        snapshot = json.loads(line)
+        current = newest.get(side)
+        if (
+            current is None
+            or snapshot["creation_time"] > current["creation_time"]
+        ):
+            newest[side] = snapshot
+
+    old = newest.get(OLD)
+    new = newest.get(NEW)
+    if old is None:
+        return {"change": "added", "host": key, "snapshot": new}
+    if new is None:
+        return {"change": "removed", "host": key, "snapshot": old}
+
+    old_fields = flatten(old)
+    new_fields = flatten(new)
+    fields = [
+        {
+            "path": format_path(json.loads(field)),
+            "old": old_fields.get(field),
+            "new": new_fields.get(field),
+        }
+        for field in sorted(set(old_fields) | set(new_fields))
+        if old_fields.get(field) != new_fields.get(field)
+    ]
+    if not fields:
+        return None
+    return {"change": "changed", "host": key, "fields": fields}
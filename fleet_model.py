@@ -0,0 +1,187 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import os
+import threading
+
+# third party library
+from PyQt5.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QThread,
+    Qt,
+    QVariant,
+    pyqtSignal,
+)
+
+# local library
+import dataset
+from records import Snapshot
+
+COLUMNS = ["Host", "OS", "Created", "Serial Number", "MAC", "IP"]
+HOST, OS, CREATED, SERIAL_NUMBER, MAC, IP = range(len(COLUMNS))
+# snapshots parsed per signal to the gui thread
+BATCH_SIZE = 1000
+# rows added to the view per fetchMore
+FETCH_SIZE = 1000
+# the loader waits while this many parsed rows are not fetched yet, so memory
+# grows with how far the view was scrolled and not with the dataset
+MAX_AHEAD = 20000
+
+
+class FleetLoader(QThread):
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, inputs, parent=None):
+        super().__init__(parent)
+        self.inputs = inputs
+        self.condition = threading.Condition()
+        self.ahead = 0
+        self.stopped = False
+
+    def run(self):
+        batch = []
+        try:
+            for path, _, snapshot in dataset.iter_valid_records(self.inputs):
+                batch.append(get_row(path, snapshot))
+                if len(batch) >= BATCH_SIZE:
+                    if not self.send(batch):
+                        return
+                    batch = []
+        except (OSError, ValueError) as error:
+            self.failed.emit(str(error))
+            return
+        if batch:
+            self.send(batch)
+
+    def send(self, batch):
+        with self.condition:
+            while self.ahead >= MAX_AHEAD and not self.stopped:
+                self.condition.wait()
+            if self.stopped:
+                return False
+            self.ahead += len(batch)
+        self.loaded.emit(batch)
+        return True
+
+    def consume(self, count):
+        with self.condition:
+            self.ahead -= count
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.wait()
+
+
+class FleetModel(QAbstractTableModel):
+    # format_time converts creation_time for display, it is only called for
+    # the cells that are painted
+    def __init__(self, loader, format_time, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.format_time = format_time
+        self.rows = []
+        self.pending = []
+        self.loader.loaded.connect(self.on_loaded)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return QVariant()
+        column = index.column()
+        if role == Qt.DisplayRole and column == CREATED:
+            return self.format_time(self.rows[index.row()][1].creation_time)
+        if role in (Qt.DisplayRole, Qt.UserRole):
+            # the user role is the raw value, which sorts creation_time
+            return get_value(self.rows[index.row()], column)
+        return QVariant()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return section + 1
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and bool(self.pending)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self.pending:
+            return
+        rows = self.pending[:FETCH_SIZE]
+        del self.pending[:FETCH_SIZE]
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+        self.loader.consume(len(rows))
+
+    def on_loaded(self, rows):
+        self.pending.extend(rows)
+        # fill the first screen, later rows are fetched as the view scrolls
+        if len(self.rows) < FETCH_SIZE:
+            self.fetchMore()
+
+
+def get_row(path, system_info):
+    # snapshots do not name their host, so single snapshot files are named
+    # after it, and packed records keep a million rows in memory
+    host = system_info.get("host")
+    if host is None and not path.endswith(dataset.NDJSON_SUFFIXES):
+        host = os.path.splitext(os.path.basename(path))[0]
+    snapshot = Snapshot.from_dict(system_info, packed=True)
+    snapshot.extra = None
+    return host, snapshot
+
+
+def get_value(row, column):
+    host, snapshot = row
+    if column == HOST:
+        return host or ""
+    if column == OS:
+        return snapshot.os
+    if column == CREATED:
+        return snapshot.creation_time
+    if column == SERIAL_NUMBER:
+        if snapshot.boot_disk is None:
+            return ""
+        return snapshot.boot_disk.serial_number or ""
+    # loopback interfaces are on every host
+    interfaces = [
+        interface
+        for interface in snapshot.network or []
+        if interface.mac not in dataset.IGNORED_MACS
+    ]
+    if column == MAC:
+        return ", ".join(interface.mac for interface in interfaces)
+    return ", ".join(interface.ip for interface in interfaces)
@@ -0,0 +1,272 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import calendar
+import json
+import os
+import struct
+from datetime import datetime as dt
+from pathlib import Path
+
+# local library
+from style import Style
+
+try:
+    # standard library
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# a full snapshot is written every this many entries, so a lookup replays
+# at most this many deltas
+CHECKPOINT_INTERVAL = 64
+
+# index entry: creation time in microseconds, offset in the log, and whether
+# the entry is a checkpoint
+INDEX_ENTRY = struct.Struct("<qQ?")
+
+
+class History:
+    # <host>.log holds one JSON entry per line, either a checkpoint
+    # {"t": creation_time, "c": snapshot} or a delta
+    # {"t": creation_time, "d": {"set": [[path, value]], "del": [path]}};
+    # <host>.idx holds one INDEX_ENTRY per line of the log
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def append(self, system_info, host):
+        if not self.directory.exists():
+            Path.mkdir(self.directory, parents=True)
+        log_path, index_path = self.get_paths(host)
+        with open(log_path, "ab") as log, open(index_path, "a+b") as index:
+            if fcntl is not None:
+                fcntl.flock(log.fileno(), fcntl.LOCK_EX)
+            time = parse_time(system_info["creation_time"])
+            entries = Index(index)
+            if len(entries):
+                last_time, _, _ = entries[len(entries) - 1]
+                if time <= last_time:
+                    return False
+                state = self._replay(log_path, entries, len(entries) - 1)
+                delta = get_delta(flatten(state), flatten(system_info))
+                if not (delta["set"] or delta["del"]):
+                    return False
+
+            checkpoint = len(entries) % CHECKPOINT_INTERVAL == 0
+            if checkpoint:
+                entry = {"t": system_info["creation_time"], "c": system_info}
+            else:
+                entry = {"t": system_info["creation_time"], "d": delta}
+            log.seek(0, os.SEEK_END)
+            offset = log.tell()
+            log.write(json.dumps(entry).encode("utf-8") + b"\n")
+            log.flush()
+            # a partially written last entry is overwritten
+            index.truncate(len(entries) * INDEX_ENTRY.size)
+            index.write(INDEX_ENTRY.pack(time, offset, checkpoint))
+        return True
+
+    def get_state(self, host, at=None):
+        log_path, index_path = self.get_paths(host)
+        try:
+            index = open(index_path, "rb")
+        except OSError:
+            return None
+        with index:
+            entries = Index(index)
+            if at is None:
+                position = len(entries) - 1
+            else:
+                position = find_position(entries, parse_time(at))
+            if position < 0:
+                return None
+            return self._replay(log_path, entries, position)
+
+    def iter_entries(self, host):
+        # only log lines with an index entry are part of the history
+        log_path, index_path = self.get_paths(host)
+        with open(index_path, "rb") as index, open(log_path, "rb") as fin:
+            entries = Index(index)
+            for start in range(0, len(entries), CHECKPOINT_INTERVAL):
+                stop = min(start + CHECKPOINT_INTERVAL, len(entries))
+                for _, offset, _ in entries.read(start, stop):
+                    fin.seek(offset)
+                    yield json.loads(fin.readline())
+
+    def get_hosts(self):
+        return sorted(path.stem for path in self.directory.glob("*.idx"))
+
+    def get_paths(self, host):
+        name = host.replace(os.sep, "_")
+        return (
+            self.directory / (name + ".log"),
+            self.directory / (name + ".idx"),
+        )
+
+    def _replay(self, log_path, entries, position):
+        # checkpoints are every CHECKPOINT_INTERVAL entries, so one read
+        # usually holds the checkpoint and every delta after it
+        start = position - position % CHECKPOINT_INTERVAL
+        replayed = entries.read(start, position + 1)
+        while not replayed[0][2]:
+            start -= 1
+            replayed.insert(0, entries[start])
+        with open(log_path, "rb") as fin:
+            fin.seek(replayed[0][1])
+            state = json.loads(fin.readline())["c"]
+            flat = flatten(state)
+            # seek to every entry, a log line without an index entry, left by
+            # a crash between the two writes, is not part of the history
+            for _, offset, _ in replayed[1:]:
+                fin.seek(offset)
+                entry = json.loads(fin.readline())
+                for path, value in entry["d"]["set"]:
+                    flat[_to_key(path)] = value
+                for path in entry["d"]["del"]:
+                    flat.pop(_to_key(path), None)
+                state["creation_time"] = entry["t"]
+        creation_time = state["creation_time"]
+        state = unflatten(flat)
+        state["creation_time"] = creation_time
+        return state
+
+
+class Index:
+    # fixed-width entries read on demand, so that a lookup reads O(log n)
+    # entries instead of the whole index
+    def __init__(self, fin):
+        self.fin = fin
+        # ignore a partially written last entry
+        self.count = os.fstat(fin.fileno()).st_size // INDEX_ENTRY.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        if not 0 <= position < self.count:
+            raise IndexError(position)
+        self.fin.seek(position * INDEX_ENTRY.size)
+        return INDEX_ENTRY.unpack(self.fin.read(INDEX_ENTRY.size))
+
+    def read(self, start, stop):
+        self.fin.seek(start * INDEX_ENTRY.size)
+        data = self.fin.read((stop - start) * INDEX_ENTRY.size)
+        return list(INDEX_ENTRY.iter_unpack(data))
+
+
+def find_position(entries, time):
+    # position of the last entry at or before time, -1 if there is none
+    low, high = 0, len(entries)
+    while low < high:
+        middle = (low + high) // 2
+        if entries[middle][0] <= time:
+            low = middle + 1
+        else:
+            high = middle
+    return low - 1
+
+
+def parse_time(text):
+    try:
+        time = dt.strptime(text, Style.utc_datetime_fmt)
+    except ValueError:
+        time = dt.fromisoformat(text.rstrip("Z"))
+    # times without an offset are UTC, others are converted to UTC
+    return calendar.timegm(time.utctimetuple()) * 1000000 + time.microsecond
+
+
+def flatten(system_info):
+    # map each leaf to its path; lists of records with a name, such as the
+    # network interfaces, are keyed by name so that a change of one
+    # interface only touches its own fields
+    flat = {}
+    _flatten(
+        {
+            key: value
+            for key, value in system_info.items()
+            if key != "creation_time"
+        },
+        [],
+        flat,
+    )
+    return flat
+
+
+def unflatten(flat):
+    root = {}
+    for key, value in flat.items():
+        path = json.loads(key)
+        node = root
+        for element, next_element in zip(path, path[1:]):
+            if isinstance(element, list):
+                node = _find_or_append(node, element[0])
+                continue
+            if element not in node:
+                node[element] = [] if isinstance(next_element, list) else {}
+            node = node[element]
+        node[path[-1]] = value
+    return root
+
+
+def get_delta(old, new):
+    return {
+        "set": [
+            [json.loads(key), value]
+            for key, value in new.items()
+            if key not in old or old[key] != value
+        ],
+        "del": [json.loads(key) for key in old if key not in new],
+    }
+
+
+def format_path(path):
+    return "/".join(
+        element[0] if isinstance(element, list) else element
+        for element in path
+    )
+
+
+def _flatten(value, path, flat):
+    if isinstance(value, dict) and value:
+        for key, item in value.items():
+            _flatten(item, path + [key], flat)
+    elif (
+        isinstance(value, list)
+        and value
+        and all(isinstance(item, dict) and "name" in item for item in value)
+    ):
+        for item in value:
+            item_path = path + [[item["name"]]]
+            for key, field in item.items():
+                _flatten(field, item_path + [key], flat)
+    else:
+        flat[_to_key(path)] = value
+
+
+def _find_or_append(records, name):
+    for record in records:
+        if record["name"] == name:
+            return record
+    record = {"name": name}
+    records.append(record)
+    return record
+
+
+def _to_key(path):
+    return json.dumps(path)
@@ -0,0 +1,182 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import os
+
+# local library
+from linux import paths
+
+MOUNTINFO = "/proc/self/mountinfo"
+SYS_DEV_BLOCK = "/sys/dev/block"
+SYS_CLASS_BLOCK = "/sys/class/block"
+
+
+def get_mounts():
+    # see proc(5) for the format of /proc/[pid]/mountinfo
+    mounts = []
+    with open(paths.join(MOUNTINFO), encoding="utf-8") as fin:
+        for line in fin:
+            fields = line.split()
+            separator = fields.index("-", 6)
+            major, minor = fields[2].split(":")
+            mounts.append(
+                {
+                    "mount_point": _unescape(fields[4]),
+                    "device": (int(major), int(minor)),
+                    "fs_type": fields[separator + 1],
+                    "source": _unescape(fields[separator + 2]),
+                    "options": fields[separator + 3],
+                }
+            )
+    return mounts
+
+
+def find_mount(path, mounts):
+    st_dev = os.stat(paths.join(path)).st_dev
+    device = (os.major(st_dev), os.minor(st_dev))
+    # the last matching entry is the one that is visible when mounts are
+    # stacked on the same mount point
+    for mount in reversed(mounts):
+        if mount["device"] == device:
+            return mount
+    return None
+
+
+def get_block_device(mount, mounts=None):
+    if mount["fs_type"] == "overlay":
+        return _get_overlay_device(mount, mounts)
+    # btrfs and some other file systems report an anonymous device number,
+    # so fall back to the device node of the mount source
+    name = _get_device_name(*mount["device"])
+    if name is None and mount["source"].startswith("/dev/"):
+        try:
+            st_rdev = os.stat(paths.join(mount["source"])).st_rdev
+        except OSError:
+            return None
+        name = _get_device_name(os.major(st_rdev), os.minor(st_rdev))
+    return name
+
+
+def get_parent_disks(name):
+    # resolve a partition to its disk, and a device-mapper or md device
+    # (LVM, LUKS, software RAID) to the disks below it
+    sys_class_block = paths.join(SYS_CLASS_BLOCK)
+    slaves_dir = os.path.join(sys_class_block, name, "slaves")
+    try:
+        slaves = sorted(os.listdir(slaves_dir))
+    except OSError:
+        slaves = []
+    if slaves:
+        disks = []
+        for slave in slaves:
+            for disk in get_parent_disks(slave):
+                if disk not in disks:
+                    disks.append(disk)
+        return disks
+
+    device_dir = os.path.join(sys_class_block, name)
+    if os.path.exists(os.path.join(device_dir, "partition")):
+        parent = os.path.basename(
+            os.path.dirname(os.path.realpath(device_dir))
+        )
+        return get_parent_disks(parent)
+    return [name]
+
+
+def resolve(path, mounts=None):
+    if mounts is None:
+        mounts = get_mounts()
+    mount = find_mount(path, mounts)
+    if mount is None:
+        return None
+    name = get_block_device(mount, mounts)
+    if name is None:
+        return None
+    if mount["source"].startswith("/dev/"):
+        device = mount["source"]
+    else:
+        device = "/dev/" + name
+    return {
+        "mount_point": mount["mount_point"],
+        "device": device,
+        "disks": ["/dev/" + disk for disk in get_parent_disks(name)],
+    }
+
+
+def get_mounted_disks(mounts=None):
+    if mounts is None:
+        mounts = get_mounts()
+    # a device is often mounted several times, e.g. by bind mounts
+    parents = {}
+    mounted_disks = []
+    for mount in mounts:
+        name = get_block_device(mount, mounts)
+        if name is None:
+            continue
+        if name not in parents:
+            parents[name] = [
+                "/dev/" + disk for disk in get_parent_disks(name)
+            ]
+        mounted_disks.append(
+            {
+                "mount_point": mount["mount_point"],
+                "device": "/dev/" + name,
+                "disks": parents[name],
+            }
+        )
+    return mounted_disks
+
+
+def _get_overlay_device(mount, mounts):
+    # the root of a container is usually an overlay, whose writable upper
+    # directory lives on the block device that holds the container data
+    if mounts is None:
+        mounts = get_mounts()
+    for option in mount["options"].split(","):
+        key, _, value = option.partition("=")
+        if key == "upperdir":
+            break
+    else:
+        return None
+    try:
+        upper = find_mount(_unescape(value), mounts)
+    except OSError:
+        return None
+    if upper is None or upper["fs_type"] == "overlay":
+        return None
+    return get_block_device(upper, mounts)
+
+
+def _get_device_name(major, minor):
+    link = os.path.join(paths.join(SYS_DEV_BLOCK), f"{major}:{minor}")
+    if not os.path.exists(link):
+        return None
+    return os.path.basename(os.path.realpath(link))
+
+
+def _unescape(field):
+    # mountinfo escapes space, tab, newline and backslash as octal
+    if "\\" not in field:
+        return field
+    return (
+        field.encode("latin-1")
+        .decode("unicode_escape")
+        .encode("latin-1")
+        .decode("utf-8", "replace")
+    )
@@ -0,0 +1,159 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import os
+
+# local library
+from linux import block_device, paths
+
+SYS_BLOCK = "/sys/block"
+DEV_DISK_BY_ID = "/dev/disk/by-id"
+SECTOR_SIZE = 512
+
+# attributes relative to /sys/block/<name>, the first readable one wins
+ATTRIBUTES = {
+    "serial_number": ["serial", "device/serial", "device/vpd_pg80"],
+    "model": ["device/model"],
+    "wwn": ["wwid", "device/wwid"],
+    "size": ["size"],
+    "rotational": ["queue/rotational"],
+}
+
+
+def get_disks():
+    sys_block = paths.join(SYS_BLOCK)
+    names = [
+        name
+        for name in sorted(os.listdir(sys_block))
+        # partitions, loop, zram and device-mapper devices have no device
+        if os.path.exists(os.path.join(sys_block, name, "device"))
+    ]
+    values = _read_all(
+        os.path.join(sys_block, name, attribute)
+        for name in names
+        for attributes in ATTRIBUTES.values()
+        for attribute in attributes
+    )
+    by_id = _get_by_id()
+    mounts = block_device.get_mounts()
+    boot_device = block_device.resolve("/", mounts)
+    boot_disks = boot_device["disks"] if boot_device else []
+    mount_points = {}
+    for mounted_disk in block_device.get_mounted_disks(mounts):
+        for disk in mounted_disk["disks"]:
+            points = mount_points.setdefault(disk, [])
+            if mounted_disk["mount_point"] not in points:
+                points.append(mounted_disk["mount_point"])
+
+    disks = []
+    for name in names:
+        disk = {"name": "/dev/" + name}
+        for key, attributes in ATTRIBUTES.items():
+            disk[key] = None
+            for attribute in attributes:
+                value = values.get(os.path.join(sys_block, name, attribute))
+                if value:
+                    disk[key] = value
+                    break
+        links = by_id.get(name, [])
+        if disk["serial_number"] is None:
+            disk["serial_number"] = _serial_from_by_id(links)
+        if disk["wwn"] is None:
+            disk["wwn"] = _wwn_from_by_id(links)
+        if disk["size"] is not None:
+            disk["size"] = int(disk["size"]) * SECTOR_SIZE
+        if disk["rotational"] is not None:
+            disk["rotational"] = disk["rotational"] == "1"
+        disk["by_id"] = links
+        disk["boot"] = disk["name"] in boot_disks
+        # mount points of the disk's partitions and of the LVM, RAID or LUKS
+        # devices on it
+        disk["mount_points"] = mount_points.get(disk["name"], [])
+        disks.append(disk)
+    return disks
+
+
+def get_serial_number(name):
+    disk_dir = os.path.join(paths.join(SYS_BLOCK), name)
+    values = _read_all(
+        os.path.join(disk_dir, attribute)
+        for attribute in ATTRIBUTES["serial_number"]
+    )
+    for attribute in ATTRIBUTES["serial_number"]:
+        value = values.get(os.path.join(disk_dir, attribute))
+        if value:
+            return value
+    return _serial_from_by_id(_get_by_id().get(name, []))
+
+
+def _read_all(paths):
+    # plain os.read on each attribute avoids building a file object per read,
+    # which dominates when there are hundreds of disks
+    values = {}
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            data = os.read(fd, 4096)
+        except OSError:
+            continue
+        finally:
+            os.close(fd)
+        if path.endswith("vpd_pg80"):
+            # unit serial number vpd page, the serial follows a 4 byte header
+            data = data[4:]
+        values[path] = data.strip(b"\0 \n").decode("utf-8", "replace")
+    return values
+
+
+def _get_by_id():
+    by_id = {}
+    try:
+        entries = list(os.scandir(paths.join(DEV_DISK_BY_ID)))
+    except OSError:
+        return by_id
+    for entry in entries:
+        try:
+            target = os.path.basename(os.readlink(entry.path))
+        except OSError:
+            continue
+        by_id.setdefault(target, []).append(entry.name)
+    for links in by_id.values():
+        links.sort()
+    return by_id
+
+
+def _serial_from_by_id(links):
+    # ata-<model>_<serial>, nvme-<model>_<serial> and virtio-<serial>
+    for link in links:
+        bus, _, rest = link.partition("-")
+        if bus in ("ata", "nvme") and "_" in rest:
+            return rest.rsplit("_", 1)[1]
+        if bus == "virtio":
+            return rest
+    return None
+
+
+def _wwn_from_by_id(links):
+    for link in links:
+        if link.startswith("wwn-"):
+            return link[len("wwn-") :]
+    return None
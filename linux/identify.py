@@ -0,0 +1,147 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import ctypes
+import fcntl
+import os
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# local library
+from linux import paths
+
+# from <linux/hdreg.h>
+HDIO_GET_IDENTITY = 0x030D
+# sizeof(struct hd_driveid)
+ATA_IDENTITY_SIZE = 512
+# struct hd_driveid starts with 10 words, then serial_no[20], 3 words,
+# fw_rev[8] and model[40]; the rest of the struct is never read
+ATA_IDENTITY = struct.Struct("@20x 20s 6x 8s 40s")
+
+# _IOWR('N', 0x41, struct nvme_admin_cmd) from <linux/nvme_ioctl.h>
+NVME_IOCTL_ADMIN_CMD = 0xC0484E41
+NVME_ADMIN_IDENTIFY = 0x06
+NVME_IDENTIFY_CNS_CTRL = 0x01
+NVME_IDENTIFY_SIZE = 4096
+# struct nvme_admin_cmd: opcode, flags, rsvd1, nsid, cdw2, cdw3, metadata,
+# addr, metadata_len, data_len, cdw10 to cdw15, timeout_ms, result
+NVME_ADMIN_CMD = struct.Struct("=BBHIIIQQII6III")
+# struct nvme_id_ctrl starts with vid, ssvid, sn[20], mn[40] and fr[8]
+NVME_ID_CTRL = struct.Struct("=4x 20s 40s 8s")
+
+
+class IdentifyEngine:
+    def __init__(self, ioctl=fcntl.ioctl, open_device=None):
+        # ioctl and open_device are replaceable to identify recorded pages
+        self.ioctl = ioctl
+        self.open_device = open_device or _open_device
+        self.local = threading.local()
+
+    def identify(self, path):
+        buffers = self._get_buffers()
+        fd = self.open_device(path)
+        try:
+            if os.path.basename(path).startswith("nvme"):
+                return self._identify_nvme(fd, buffers)
+            return self._identify_ata(fd, buffers)
+        finally:
+            os.close(fd)
+
+    def identify_many(self, paths, max_workers=8):
+        # a failing or missing device only affects its own entry
+        def identify(path):
+            try:
+                return self.identify(path)
+            except OSError as error:
+                return {"error": str(error) or type(error).__name__}
+
+        paths = list(paths)
+        if not paths:
+            return {}
+        workers = min(max_workers, len(paths))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(paths, executor.map(identify, paths)))
+
+    def _identify_ata(self, fd, buffers):
+        buf = buffers["ata"]
+        self.ioctl(fd, HDIO_GET_IDENTITY, buf, True)
+        serial, firmware, model = ATA_IDENTITY.unpack_from(buf)
+        return _identity(serial, model, firmware)
+
+    def _identify_nvme(self, fd, buffers):
+        buf = buffers["nvme"]
+        command = buffers["nvme_command"]
+        NVME_ADMIN_CMD.pack_into(
+            command,
+            0,
+            NVME_ADMIN_IDENTIFY,
+            0,
+            0,
+            0,
+            0,
+            0,
+            0,
+            buffers["nvme_address"],
+            0,
+            NVME_IDENTIFY_SIZE,
+            NVME_IDENTIFY_CNS_CTRL,
+            0,
+            0,
+            0,
+            0,
+            0,
+            0,
+            0,
+        )
+        self.ioctl(fd, NVME_IOCTL_ADMIN_CMD, command, True)
+        serial, model, firmware = NVME_ID_CTRL.unpack_from(buf)
+        return _identity(serial, model, firmware)
+
+    def _get_buffers(self):
+        # one set of buffers per thread, allocated once and reused
+        buffers = getattr(self.local, "buffers", None)
+        if buffers is None:
+            nvme = bytearray(NVME_IDENTIFY_SIZE)
+            buffers = {
+                "ata": bytearray(ATA_IDENTITY_SIZE),
+                "nvme": nvme,
+                "nvme_address": ctypes.addressof(
+                    (ctypes.c_char * NVME_IDENTIFY_SIZE).from_buffer(nvme)
+                ),
+                "nvme_command": bytearray(NVME_ADMIN_CMD.size),
+            }
+            self.local.buffers = buffers
+        return buffers
+
+
+def _open_device(path):
+    return os.open(paths.join(path), os.O_RDONLY | os.O_NONBLOCK)
+
+
+def _identity(serial, model, firmware):
+    return {
+        "serial_number": _decode(serial),
+        "model": _decode(model),
+        "firmware": _decode(firmware),
+    }
+
+
+def _decode(field):
+    return field.strip(b"\0 ").decode("ascii", "replace")
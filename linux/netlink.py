@@ -0,0 +1,175 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import socket
+import struct
+
+# constants from <linux/netlink.h>, <linux/rtnetlink.h>, <linux/if_link.h>
+# and <linux/if_addr.h>
+NETLINK_ROUTE = 0
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+RTM_NEWLINK = 16
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+
+# multicast groups as bind(2) bitmasks, RTMGRP_* in <linux/rtnetlink.h>
+RTMGRP_LINK = 1 << (1 - 1)
+RTMGRP_IPV4_IFADDR = 1 << (5 - 1)
+RTMGRP_IPV6_IFADDR = 1 << (9 - 1)
+
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_LABEL = 3
+
+# struct nlmsghdr, struct ifinfomsg, struct ifaddrmsg and struct rtattr
+NLMSGHDR = struct.Struct("=IHHII")
+IFINFOMSG = struct.Struct("=BxHiII")
+IFADDRMSG = struct.Struct("=BBBBI")
+RTATTR = struct.Struct("=HH")
+
+RECV_BUFFER_SIZE = 1 << 16
+
+
+def open_socket(groups=0):
+    sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+    sock.bind((0, groups))
+    return sock
+
+
+def get_network_info():
+    with open_socket() as sock:
+        links = {}
+        for _, body in dump(sock, RTM_GETLINK, 1, _link_request()):
+            index, name, mac = parse_link(body)
+            links[index] = (name, mac)
+
+        network_info = []
+        seen = set()
+        request = _addr_request(socket.AF_INET)
+        for _, body in dump(sock, RTM_GETADDR, 2, request):
+            index, name, ip = parse_addr(body)
+            if index not in links or ip is None:
+                continue
+            link_name, mac = links[index]
+            name = name or link_name
+            # like netifaces, only the first address of each interface
+            if name in seen:
+                continue
+            seen.add(name)
+            network_info.append({"name": name, "ip": ip, "mac": mac})
+    return network_info
+
+
+def dump(sock, message_type, seq, payload):
+    header = NLMSGHDR.pack(
+        NLMSGHDR.size + len(payload),
+        message_type,
+        NLM_F_REQUEST | NLM_F_DUMP,
+        seq,
+        0,
+    )
+    sock.send(header + payload)
+
+    buf = bytearray(RECV_BUFFER_SIZE)
+    view = memoryview(buf)
+    while True:
+        size = sock.recv_into(buf)
+        for message_type, body in iter_messages(view[:size]):
+            if message_type == NLMSG_DONE:
+                return
+            if message_type == NLMSG_ERROR:
+                (error,) = struct.unpack_from("=i", body)
+                if error:
+                    raise OSError(-error, "netlink dump failed")
+                continue
+            # the buffer is reused by the next recv, so the body is only
+            # valid until the caller asks for the next message
+            yield message_type, body
+
+
+def iter_messages(view):
+    offset = 0
+    end = len(view)
+    while offset + NLMSGHDR.size <= end:
+        length, message_type, _, _, _ = NLMSGHDR.unpack_from(view, offset)
+        if length < NLMSGHDR.size:
+            break
+        yield message_type, view[offset + NLMSGHDR.size : offset + length]
+        offset += _align(length)
+
+
+def iter_attributes(body, offset):
+    end = len(body)
+    while offset + RTATTR.size <= end:
+        length, attribute_type = RTATTR.unpack_from(body, offset)
+        if length < RTATTR.size:
+            break
+        yield attribute_type, body[offset + RTATTR.size : offset + length]
+        offset += _align(length)
+
+
+def parse_link(body):
+    _, _, index, _, _ = IFINFOMSG.unpack_from(body)
+    name = ""
+    mac = ""
+    for attribute_type, value in iter_attributes(body, IFINFOMSG.size):
+        if attribute_type == IFLA_IFNAME:
+            name = bytes(value).rstrip(b"\0").decode()
+        elif attribute_type == IFLA_ADDRESS:
+            mac = ":".join(f"{octet:02x}" for octet in value)
+    return index, name, mac
+
+
+def parse_addr(body):
+    family, _, _, _, index = IFADDRMSG.unpack_from(body)
+    label = ""
+    local = None
+    address = None
+    for attribute_type, value in iter_attributes(body, IFADDRMSG.size):
+        if attribute_type == IFA_LOCAL:
+            local = socket.inet_ntop(family, value)
+        elif attribute_type == IFA_ADDRESS:
+            address = socket.inet_ntop(family, value)
+        elif attribute_type == IFA_LABEL:
+            label = bytes(value).rstrip(b"\0").decode()
+    # IFA_ADDRESS is the peer address on point-to-point links
+    ip = local if local is not None else address
+    return index, label, ip
+
+
+def _link_request():
+    return IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+
+
+def _addr_request(family):
+    return IFADDRMSG.pack(family, 0, 0, 0, 0)
+
+
+def _align(length):
+    return (length + 3) & ~3
@@ -0,0 +1,39 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import os
+
+# procfs, sysfs and /dev are read below this directory, which benchmarks point
+# at a generated tree
+_root = "/"
+
+
+def set_root(root):
+    global _root
+    _root = root
+
+
+def get_root():
+    return _root
+
+
+def join(path):
+    if _root == "/":
+        return path
+    return os.path.join(_root, path.lstrip("/"))
@@ -16,53 +16,92 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 # standard library
-import fcntl
-import re
-import shlex
-import struct
-import subprocess
+import os
 
 # third party library
 import netifaces as ni
 
+# local library
+from cache import get_device_key
+from collector import register
+from linux import block_device, disk_inventory, netlink, paths
+from linux.identify import IdentifyEngine
 
+identify_engine = IdentifyEngine()
+# None tries netlink, then netifaces
+network_backend = None
+
+
+def configure(root="/", network=None):
+    # root is where procfs, sysfs and /dev are read, and network is None,
+    # "netlink", "netifaces" or a module with the netifaces interface, so
+    # that benchmarks can collect from a generated host
+    global network_backend
+    paths.set_root(root)
+    network_backend = network
+
+
+@register("network", ["Linux"], cache="volatile", timeout=5)
 def get_network_info():
+    if network_backend is None:
+        try:
+            return netlink.get_network_info()
+        except OSError:
+            return _get_network_info_netifaces(ni)
+    if network_backend == "netlink":
+        return netlink.get_network_info()
+    if network_backend == "netifaces":
+        return _get_network_info_netifaces(ni)
+    return _get_network_info_netifaces(network_backend)
+
+
+def _get_network_info_netifaces(ni):
     interfaces = ni.interfaces()
     network_info = []
     for interface in interfaces:
         if_addresses = ni.ifaddresses(interface)
-        mac = if_addresses[ni.AF_LINK][0]["addr"]
+        if ni.AF_INET not in if_addresses:
+            continue
+        mac = if_addresses.get(ni.AF_LINK, [{"addr": ""}])[0]["addr"]
         ip = if_addresses[ni.AF_INET][0]["addr"]
         network_info.append({"name": interface, "ip": ip, "mac": mac})
     return network_info
 
 
+@register(
+    "boot_disk",
+    ["Linux"],
+    cache="static",
+    cache_key=lambda: get_device_key("/"),
+    timeout=5,
+    isolate=True,
+)
 def get_disk_info():
-    out = subprocess.Popen(
-        shlex.split("df /"), stdout=subprocess.PIPE
-    ).communicate()
-    m = re.search(r"(/[^\s]+)\s", str(out))
-    mount_point = m.group(1)
-
-    with open(mount_point, "rb") as fd:
-        # tediously derived from the monster struct defined in <hdreg.h>
-        # see comment at end of file to verify
-        hd_driveid_format_str = (
-            "@ 10H 20s 3H 8s 40s 2B H 2B H 4B 6H 2B I 36H I Q 152H"
-        )
-        # Also from <hdreg.h>
-        HDIO_GET_IDENTITY = 0x030D
-        # How big a buffer do we need?
-        sizeof_hd_driveid = struct.calcsize(hd_driveid_format_str)
-
-        # ensure our format string is the correct size
-        # 512 is extracted using sizeof(struct hd_id) in the c code
-        assert sizeof_hd_driveid == 512
-
-        # Call native function
-        buf = fcntl.ioctl(fd, HDIO_GET_IDENTITY, " " * sizeof_hd_driveid)
-        fields = struct.unpack(hd_driveid_format_str, buf)
-        serial_number = fields[10].strip().decode()
+    boot_device = block_device.resolve("/")
+    if boot_device is None:
+        raise RuntimeError("Cannot find the block device mounted on '/'.")
+    # the device which is mounted on '/', as reported by df
+    mount_point = boot_device["device"]
+
+    # a root on LVM or RAID may span several disks, take the first one
+    # that identifies itself
+    identities = identify_engine.identify_many(boot_device["disks"])
+    serial_number = None
+    for disk, identity in identities.items():
+        serial_number = identity.get("serial_number")
+        if not serial_number:
+            # the ioctls need root and a supported disk, otherwise fall back
+            # to what sysfs knows, e.g. for virtio disks
+            serial_number = disk_inventory.get_serial_number(
+                os.path.basename(disk)
+            )
+        if serial_number:
+            break
 
     disk_info = {"mount_point": mount_point, "serial_number": serial_number}
     return disk_info
+
+
+@register("disks", ["Linux"], cache="volatile", timeout=5)
+def get_disks_info():
+    return disk_inventory.get_disks()
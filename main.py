@@ -17,6 +17,7 @@
 
 # standard library
 import json
+import socket
 import sys
 from datetime import datetime as dt
 from pathlib import Path
@@ -24,16 +25,18 @@ from platform import system
 
 # third party library
 import click
-from PyQt5 import QtWidgets
 
 # local library
-from console_app import ConsoleApp
-from my_widget import MyWidget, Style
+import profiler
+from style import Style
 
 
 class App:
-    def __init__(self, paths):
+    def __init__(self, paths, cache=None, timeout=None, oui=None):
         self.paths = paths
+        self.cache = cache
+        self.timeout = timeout
+        self.oui = oui
 
         my_system = system()
         if my_system == "Linux":
@@ -46,29 +49,40 @@ class App:
             )
             sys.exit()
 
-    def get_info(self):
-        if self.my_system == "Linux":
-            # local library
-            from linux import system_info
-        else:
-            # local library
-            from windows import system_info
+    def get_info(self, on_result=None):
+        # local library
+        from collector import collect
 
-        network_info = system_info.get_network_info()
-        disk_info = system_info.get_disk_info()
+        def add_result(name, value):
+            if name == "network" and self.oui is not None:
+                self.oui.enrich(value)
+            if on_result is not None:
+                on_result(name, value)
+
+        with profiler.span("get_info"):
+            results, errors, timed_out = collect(
+                self.my_system, self.cache, self.timeout, add_result
+            )
         now = dt.utcnow().strftime(Style.utc_datetime_fmt)
         system_info = {
             "os": self.my_system,
             "creation_time": now,
-            "network": network_info,
-            "boot_disk": disk_info,
         }
+        system_info.update(results)
+        # only present when something could not be collected
+        if errors:
+            system_info["errors"] = errors
+        if timed_out:
+            system_info["timed_out"] = timed_out
         return system_info
 
     def save_info(self, system_info, path):
-        json_data = json.dumps(system_info)
-        with open(path, "wt", encoding="utf-8") as fout:
-            fout.write(json_data)
+        # local library
+        from snapshot_store import write_atomic
+
+        with profiler.span("save_info"):
+            json_data = json.dumps(system_info)
+            write_atomic(path, json_data.encode("utf-8"))
 
 
 def get_path():
@@ -88,11 +102,104 @@ def get_path():
     return paths
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option("--gui", "/gui", is_flag=True, help="Use gui version.")
 @click.option("--output", "/output", help="Specify path to output file.")
 @click.option("--version", "/version", is_flag=True, help="Show version.")
-def main(gui, output, version):
+@click.option(
+    "--watch",
+    "/watch",
+    is_flag=True,
+    help="Print network changes as they happen, as NDJSON.",
+)
+@click.option("--no-cache", "/no-cache", is_flag=True, help="Do not cache.")
+@click.option(
+    "--refresh",
+    "/refresh",
+    is_flag=True,
+    help="Collect again and update the cache.",
+)
+@click.option(
+    "--cache-ttl",
+    "/cache-ttl",
+    default=60.0,
+    show_default=True,
+    help="Seconds to cache network information.",
+)
+@click.option(
+    "--timeout",
+    "/timeout",
+    type=float,
+    help="Seconds to wait for collection, then report what finished.",
+)
+@click.option(
+    "--store",
+    "/store",
+    help="Save to a snapshot store, skipped if nothing changed.",
+)
+@click.option(
+    "--history",
+    "/history",
+    help="Append to the history logs in this directory.",
+)
+@click.option(
+    "--host",
+    "/host",
+    default=socket.gethostname,
+    help="Host name in the snapshot store.",
+)
+@click.option(
+    "--yes",
+    "/yes",
+    is_flag=True,
+    help="Overwrite output file without asking.",
+)
+@click.option(
+    "--auto-refresh",
+    "/auto-refresh",
+    type=float,
+    help="Seconds between refreshes of the gui version.",
+)
+@click.option(
+    "--profile",
+    "/profile",
+    is_flag=True,
+    help="Print where the time went on exit.",
+)
+@click.option(
+    "--trace",
+    "/trace",
+    help="Write a Chrome trace of where the time went to this path.",
+)
+@click.option(
+    "--oui",
+    "/oui",
+    help="Add interface vendors from this compiled OUI table.",
+)
+@click.pass_context
+def main(
+    ctx,
+    gui,
+    output,
+    version,
+    watch,
+    no_cache,
+    refresh,
+    cache_ttl,
+    timeout,
+    store,
+    history,
+    host,
+    yes,
+    auto_refresh,
+    profile,
+    trace,
+    oui,
+):
+    if profile or trace is not None:
+        profiler.enable()
+        ctx.call_on_close(lambda: report_profile(profile, trace))
+
     paths = get_path()
 
     if version:
@@ -100,16 +207,405 @@ def main(gui, output, version):
             print(fin.read()[:-1])
         return
 
-    my_app = App(paths)
+    if ctx.invoked_subcommand is not None:
+        ctx.obj = paths
+        return
+
+    if no_cache:
+        cache = None
+    else:
+        # local library
+        from cache import FactCache
+
+        # the gui version refreshes on request, so it only caches static facts
+        cache = FactCache(ttl=0 if gui else cache_ttl, refresh=refresh)
+    if oui is not None:
+        # local library
+        from oui import OuiTable
+
+        oui = OuiTable(oui)
+    my_app = App(paths, cache, timeout, oui)
 
     if gui:
+        # PyQt5 and dateutil are only loaded for the gui version, so that the
+        # console version starts without paying for their import
+        with profiler.span("import gui"):
+            # third party library
+            from PyQt5 import QtWidgets
+
+            # local library
+            from my_widget import MyWidget
+
         gui_app = QtWidgets.QApplication([])
-        widget = MyWidget(my_app)
+        widget = MyWidget(my_app, auto_refresh)
         gui_app.exec_()
+    elif watch:
+        # local library
+        from watch import watch as watch_changes
+
+        watch_changes(my_app)
     else:
-        console_app = ConsoleApp(my_app, output)
+        # local library
+        from console_app import ConsoleApp
+
+        if store is not None:
+            # local library
+            from snapshot_store import SnapshotStore
+
+            store = SnapshotStore(store)
+        if history is not None:
+            # local library
+            from history import History
+
+            history = History(history)
+        console_app = ConsoleApp(my_app, output, store, host, yes, history)
         console_app.run()
 
 
+def report_profile(profile, trace):
+    if profile:
+        profiler.print_report()
+    if trace is not None:
+        profiler.write_trace(trace)
+
+
+@main.command()
+@click.option("--socket", "socket_path", help="Specify path to unix socket.")
+@click.option("--port", type=int, help="Also serve on localhost:<port>.")
+@click.option(
+    "--interval",
+    default=300.0,
+    show_default=True,
+    help="Seconds between refreshes.",
+)
+@click.pass_obj
+def serve(paths, socket_path, port, interval):
+    """Serve information as JSON over a unix socket and HTTP."""
+    # local library
+    import server
+
+    if socket_path is None:
+        socket_path = server.get_default_socket_path()
+    server.serve(App(paths), socket_path, port, interval)
+
+
+@main.group(name="history")
+@click.option(
+    "--directory", required=True, help="Directory of the history logs."
+)
+@click.pass_context
+def history_group(ctx, directory):
+    """Read the history of hosts."""
+    # local library
+    from history import History
+
+    ctx.obj = History(directory)
+
+
+@history_group.command(name="hosts")
+@click.pass_obj
+def history_hosts(history):
+    """List hosts with a history."""
+    for host in history.get_hosts():
+        print(host)
+
+
+@history_group.command(name="show")
+@click.argument("host")
+@click.option(
+    "--at",
+    help="Show the state at this time instead of now, UTC unless it has an "
+    "offset.",
+)
+@click.pass_obj
+def history_show(history, host, at):
+    """Show the state of a host."""
+    # local library
+    from history import parse_time
+
+    if at is not None:
+        try:
+            parse_time(at)
+        except ValueError as error:
+            raise click.BadParameter(str(error), param_hint="'--at'")
+    system_info = history.get_state(host, at)
+    if system_info is None:
+        print(f"No history of '{host}' at that time.")
+        sys.exit(1)
+    print(json.dumps(system_info, indent=4))
+
+
+@history_group.command(name="log")
+@click.argument("host")
+@click.pass_obj
+def history_log(history, host):
+    """Show what changed in each entry of a host."""
+    # local library
+    from history import format_path
+
+    _, index_path = history.get_paths(host)
+    if not index_path.exists():
+        print(f"No history of '{host}'.")
+        sys.exit(1)
+    for entry in history.iter_entries(host):
+        if "c" in entry:
+            print(f"{entry['t']}  checkpoint")
+            continue
+        for path, value in entry["d"]["set"]:
+            print(f"{entry['t']}  set {format_path(path)} = {value}")
+        for path in entry["d"]["del"]:
+            print(f"{entry['t']}  del {format_path(path)}")
+
+
+@main.command()
+@click.argument("inputs", nargs=-1, required=True)
+@click.option("--output", required=True, help="Path to the merged file.")
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["ndjson", "compact"]),
+    default="ndjson",
+    show_default=True,
+    help="One snapshot per line, or a single compact JSON array.",
+)
+@click.option("--processes", type=int, help="Number of worker processes.")
+def merge(inputs, output, output_format, processes):
+    """Merge snapshot files, keeping the newest snapshot of each host."""
+    # local library
+    from merge import merge as merge_snapshots
+
+    count, invalid = merge_snapshots(inputs, output, output_format, processes)
+    print(f"Merged {count} hosts, skipped {invalid} invalid snapshots.")
+
+
+@main.group(name="index")
+def index_group():
+    """Index MACs, IPs and serial numbers of snapshots."""
+
+
+@index_group.command(name="build")
+@click.argument("inputs", nargs=-1, required=True)
+@click.option("--index", "directory", required=True, help="Index directory.")
+@click.option(
+    "--append",
+    is_flag=True,
+    help="Only add files which are not indexed yet.",
+)
+def index_build(inputs, directory, append):
+    """Build an index over snapshot files and directories."""
+    # local library
+    from snapshot_index import SnapshotIndex
+
+    count = SnapshotIndex(directory).build(inputs, append)
+    print(f"Indexed {count} snapshots.")
+
+
+@index_group.command(name="query")
+@click.option("--index", "directory", required=True, help="Index directory.")
+@click.option("--mac", help="Find snapshots with this MAC address.")
+@click.option("--ip", help="Find snapshots with this IP address.")
+@click.option("--serial", help="Find snapshots with this disk serial number.")
+@click.option(
+    "--locations",
+    is_flag=True,
+    help="Only print where the snapshots are.",
+)
+def index_query(directory, mac, ip, serial, locations):
+    """Find the snapshots which have a MAC, IP or serial number."""
+    # local library
+    import dataset
+    from snapshot_index import SnapshotIndex, pack_key
+
+    queries = [
+        (kind, value)
+        for kind, value in (("mac", mac), ("ip", ip), ("serial", serial))
+        if value is not None
+    ]
+    if len(queries) != 1:
+        print("Specify exactly one of --mac, --ip and --serial.")
+        sys.exit(1)
+    kind, value = queries[0]
+    try:
+        pack_key(kind, value)
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint=f"'--{kind}'")
+
+    for path, offset in SnapshotIndex(directory).query(kind, value):
+        result = {"source": path, "offset": offset}
+        if not locations:
+            result["snapshot"] = dataset.read_record(path, offset)
+        print(json.dumps(result))
+
+
+@main.group(name="subnets")
+def subnets_group():
+    """Query the addresses of snapshots by subnet."""
+
+
+@subnets_group.command(name="hosts")
+@click.argument("inputs", nargs=-1, required=True)
+@click.option(
+    "--cidr", required=True, help="Subnet, e.g. 10.20.0.0/14 or fd00::/8."
+)
+def subnets_hosts(inputs, cidr):
+    """List the hosts with addresses in a subnet."""
+    # standard library
+    import ipaddress
+
+    # local library
+    from subnets import AddressColumns
+
+    # checked before the inputs are read
+    try:
+        ipaddress.ip_network(cidr, strict=False)
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint="'--cidr'")
+
+    columns = AddressColumns.from_inputs(inputs)
+    for host in columns.find_hosts(cidr):
+        print(json.dumps(host))
+
+
+@subnets_group.command(name="usage")
+@click.argument("inputs", nargs=-1, required=True)
+@click.option(
+    "--prefix",
+    default=24,
+    show_default=True,
+    type=click.IntRange(0, 32),
+    help="IPv4 subnet prefix.",
+)
+@click.option(
+    "--prefix6",
+    default=64,
+    show_default=True,
+    type=click.IntRange(0, 128),
+    help="IPv6 subnet prefix.",
+)
+def subnets_usage(inputs, prefix, prefix6):
+    """List the subnets in use and how much of each is used."""
+    # local library
+    from subnets import AddressColumns
+
+    columns = AddressColumns.from_inputs(inputs)
+    for usage in columns.get_usage(prefix, prefix6):
+        print(json.dumps(usage))
+
+
+@main.command()
+@click.argument("inputs", nargs=-1, required=True)
+@click.option("--output", help="Path to the report, standard output if not.")
+@click.option(
+    "--partitions",
+    default=64,
+    show_default=True,
+    help="Number of partitions on disk.",
+)
+@click.option(
+    "--memory",
+    default=64,
+    show_default=True,
+    help="MiB of a partition to sort in memory.",
+)
+@click.option("--temp-dir", help="Directory for the partitions.")
+def dupes(inputs, output, partitions, memory, temp_dir):
+    """Find MACs, IPs and serial numbers shared by several hosts."""
+    # local library
+    from dupes import find_duplicates
+
+    if output is None:
+        find_duplicates(inputs, sys.stdout, partitions, memory << 20, temp_dir)
+        return
+    with open(output, "w", encoding="utf-8") as fout:
+        count = find_duplicates(
+            inputs, fout, partitions, memory << 20, temp_dir
+        )
+    print(f"Found {count} duplicates.")
+
+
+@main.command()
+@click.argument("old")
+@click.argument("new")
+@click.option("--output", help="Path to the report, standard output if not.")
+@click.option(
+    "--partitions",
+    default=64,
+    show_default=True,
+    help="Number of partitions on disk.",
+)
+@click.option(
+    "--memory",
+    default=64,
+    show_default=True,
+    help="MiB of a partition to sort in memory.",
+)
+@click.option("--temp-dir", help="Directory for the partitions.")
+def diff(old, new, output, partitions, memory, temp_dir):
+    """Show hosts added, removed and changed between two collections."""
+    # local library
+    from fleet_diff import diff as diff_fleets
+
+    if output is None:
+        diff_fleets(old, new, sys.stdout, partitions, memory << 20, temp_dir)
+        return
+    with open(output, "w", encoding="utf-8") as fout:
+        counts = diff_fleets(
+            old, new, fout, partitions, memory << 20, temp_dir
+        )
+    print(
+        f"{counts['added']} added, {counts['removed']} removed, "
+        f"{counts['changed']} changed."
+    )
+
+
+@main.command()
+@click.argument("inputs", nargs=-1, required=True)
+@click.option("--output", required=True, help="Directory of the columns.")
+def export(inputs, output):
+    """Export snapshots as columns in .npy files."""
+    # local library
+    from columnar import export as export_columns
+
+    hosts, interfaces = export_columns(inputs, output)
+    print(f"Exported {hosts} hosts with {interfaces} interfaces.")
+
+
+@main.group(name="oui")
+def oui_group():
+    """Look up interface vendors in the IEEE OUI registry."""
+
+
+@oui_group.command(name="compile")
+@click.argument("csv_paths", nargs=-1, required=True)
+@click.option("--output", required=True, help="Path to the compiled table.")
+def oui_compile(csv_paths, output):
+    """Compile IEEE MA-L, MA-M and MA-S CSV files into a table."""
+    # local library
+    from oui import compile_registry
+
+    count = compile_registry(csv_paths, output)
+    print(f"Compiled {count} vendors.")
+
+
+@oui_group.command(name="enrich")
+@click.argument("inputs", nargs=-1, required=True)
+@click.option("--table", required=True, help="Path to the compiled table.")
+@click.option(
+    "--output", help="Path to the NDJSON output, standard output if not."
+)
+def oui_enrich(inputs, table, output):
+    """Add interface vendors to snapshots as NDJSON."""
+    # local library
+    from oui import OuiTable, enrich_file
+
+    oui_table = OuiTable(table)
+    if output is None:
+        enrich_file(oui_table, inputs, sys.stdout)
+        return
+    with open(output, "w", encoding="utf-8") as fout:
+        count = enrich_file(oui_table, inputs, fout)
+    print(f"Enriched {count} snapshots.")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,101 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import json
+import sys
+from multiprocessing import Pool
+
+# local library
+import dataset
+
+
+def merge(inputs, output, output_format="ndjson", processes=None):
+    # first pass: find the newest record of every host, keeping only its
+    # location, so memory grows with the number of hosts and not the data
+    newest = {}
+    invalid = 0
+    with Pool(processes) as pool:
+        scans = pool.imap_unordered(
+            _scan, dataset.iter_paths(inputs), chunksize=64
+        )
+        for path, records, errors in scans:
+            for error in errors:
+                invalid += 1
+                print(f"{path}: {error}", file=sys.stderr)
+            for identity, creation_time, offset in records:
+                current = newest.get(identity)
+                if current is None or creation_time > current[0]:
+                    newest[identity] = (creation_time, path, offset)
+
+        # second pass: read the winners back and write them out as they come
+        locations = sorted(
+            (path, offset) for _, path, offset in newest.values()
+        )
+        lines = pool.imap(_load, locations, chunksize=64)
+        with open(output, "wb") as fout:
+            count = _write(fout, lines, output_format)
+    return count, invalid
+
+
+def _scan(path):
+    records = []
+    errors = []
+
+    def on_error(offset, error):
+        errors.append(f"offset {offset}: {error}")
+
+    try:
+        for offset, snapshot in dataset.iter_file(path, on_error):
+            try:
+                dataset.validate(snapshot)
+            except ValueError as error:
+                errors.append(f"offset {offset}: {error}")
+                continue
+            records.append(
+                (
+                    dataset.get_host_identity(snapshot),
+                    snapshot["creation_time"],
+                    offset,
+                )
+            )
+    except (OSError, ValueError) as error:
+        errors.append(str(error))
+    return path, records, errors
+
+
+def _load(location):
+    snapshot = dataset.read_record(*location)
+    return json.dumps(snapshot, separators=(",", ":")).encode("utf-8")
+
+
+def _write(fout, lines, output_format):
+    count = 0
+    if output_format == "ndjson":
+        for line in lines:
+            fout.write(line + b"\n")
+            count += 1
+    else:
+        fout.write(b"[")
+        for line in lines:
+            if count:
+                fout.write(b",")
+            fout.write(line)
+            count += 1
+        fout.write(b"]\n")
+    return count
@@ -16,11 +16,17 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 # standard library
+import functools
 from datetime import datetime as dt
 
 # third party library
 from dateutil import tz
 from PyQt5.QtCore import (
+    QModelIndex,
+    QSortFilterProxyModel,
+    Qt,
+    QThreadPool,
+    QTimer,
     QUrl,
 )
 from PyQt5.QtGui import (
@@ -29,44 +35,59 @@ from PyQt5.QtGui import (
     QIcon,
 )
 from PyQt5.QtWidgets import (
+    QAbstractItemView,
     QAction,
     qApp,
+    QComboBox,
     QDialog,
     QFileDialog,
     QFrame,
     QGridLayout,
     QLabel,
     QHBoxLayout,
+    QHeaderView,
+    QLineEdit,
     QMainWindow,
+    QProgressBar,
     QSizePolicy,
     QScrollArea,
     QSpacerItem,
+    QTableView,
+    QVBoxLayout,
     QWidget,
 )
 
+# local library
+from collect_worker import CollectWorker
+from fleet_model import (
+    COLUMNS,
+    HOST,
+    IP,
+    MAC,
+    SERIAL_NUMBER,
+    FleetLoader,
+    FleetModel,
+)
+from style import Style
+from table_model import RecordTableModel
 
-class Style:
-    utc_datetime_fmt = "%Y-%m-%dT%H:%M:%S.%fZ"
-    local_datetime_fmt = "%Y-%m-%d %H:%M:%S.%f"
-
-    default_typeface_win = "Segoe UI"
-    mono_typeface_win = "Consolas"
-    mono_typeface_linux = "DejaVu Sans Mono"
-
-    default_font = 10
-    h1_font = 18
-
-    default_border = 10
-    h1_border = 100
-    key_border = 30
-    section_border = 25
+_FROM_ZONE = tz.tzutc()
+_TO_ZONE = tz.tzlocal()
 
 
 class MyWidget(QMainWindow):
-    def __init__(self, my_app):
+    def __init__(self, my_app, auto_refresh=None):
         super().__init__()
         self.my_app = my_app
         self.paths = self.my_app.paths
+        self.system_info = None
+        # incremented by every refresh, results of older ones are dropped
+        self.generation = 0
+        self.worker = None
+        # a cancelled refresh keeps its thread until its collectors return,
+        # so the next one must not queue behind it on a single core
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(4)
 
         self.setWindowTitle("Xincapio")
         self.resize(900, 600)
@@ -80,9 +101,20 @@ class MyWidget(QMainWindow):
         save_button.triggered.connect(self.on_save)
         file_menu.addAction(save_button)
 
+        open_file_button = QAction(QIcon(), "&Open Fleet File...", self)
+        open_file_button.setShortcut("Ctrl+O")
+        open_file_button.triggered.connect(self.on_open_fleet_file)
+        file_menu.addAction(open_file_button)
+
+        open_directory_button = QAction(
+            QIcon(), "Open Fleet &Directory...", self
+        )
+        open_directory_button.triggered.connect(self.on_open_fleet_directory)
+        file_menu.addAction(open_directory_button)
+
         refresh_button = QAction(QIcon(), "&Refresh", self)
         refresh_button.setShortcut("Ctrl+R")
-        refresh_button.triggered.connect(self.init_ui)
+        refresh_button.triggered.connect(self.refresh)
         file_menu.addAction(refresh_button)
 
         exit_button = QAction(QIcon(), "&Exit", self)
@@ -98,15 +130,13 @@ class MyWidget(QMainWindow):
 
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
-
-        self.layout = QHBoxLayout(self)
-        self.scroll = QScrollArea(self)
-        self.scroll.setWidgetResizable(True)
-        self.scroll_widget_contents = QWidget()
-        self.grid = QGridLayout(self.scroll_widget_contents)
-        self.scroll.setWidget(self.scroll_widget_contents)
-        self.layout.addWidget(self.scroll)
-        self.grid.setSpacing(0)
+        self.layout = QVBoxLayout(self.central_widget)
+        self.layout.setContentsMargins(
+            Style.section_border,
+            Style.section_border,
+            Style.section_border,
+            Style.section_border,
+        )
 
         self.default_font = QFont()
         self.default_font.setPointSize(Style.default_font)
@@ -124,364 +154,147 @@ class MyWidget(QMainWindow):
             self.h1_font.setFamily(Style.default_typeface_win)
             self.key_font.setFamily(Style.default_typeface_win)
 
-        self.centralWidget().setLayout(self.layout)
-
-        self.init_ui()
-
-    def init_ui(self):
-        self.system_info = self.my_app.get_info()
-        self.show_info()
-
-    def show_info(self):
-        if self.grid.count():
-            for index in reversed(range(self.grid.count())):
-                widget_to_remove = self.grid.itemAt(index).widget()
-                if widget_to_remove:
-                    self.grid.removeWidget(widget_to_remove)
-                    widget_to_remove.setParent(None)
-                else:
-                    self.grid.removeItem(self.grid.itemAt(index))
-
-        i = 0
-        blank_space = QSpacerItem(
-            0,
-            Style.section_border,
-            QSizePolicy.Minimum,
-            QSizePolicy.Minimum,
+        network_columns = [("Name", "name"), ("IP", "ip"), ("MAC", "mac")]
+        if self.my_app.oui is not None:
+            network_columns.append(("Vendor", "vendor"))
+        self.network_model = RecordTableModel(
+            network_columns, lambda network: network["name"], self
         )
-        self.grid.addItem(blank_space, i, 1)
-        i += 1
+        self.add_section("Network", self.network_model)
 
-        blank_space = QSpacerItem(
-            Style.section_border,
-            0,
-            QSizePolicy.Minimum,
-            QSizePolicy.Minimum,
+        if self.my_app.my_system == "Linux":
+            boot_disk_columns = [
+                ("Mount Point", "mount_point"),
+                ("Serial Number", "serial_number"),
+            ]
+        else:
+            boot_disk_columns = [
+                ("Device ID", "device_id"),
+                ("Index", "index"),
+                ("Serial Number", "serial_number"),
+            ]
+        # there is only one boot disk, so it is always the same row
+        self.boot_disk_model = RecordTableModel(
+            boot_disk_columns, lambda boot_disk: "boot_disk", self
         )
-        self.grid.addItem(blank_space, i, 1)
-
-        label = QLabel("Network")
-        label.setFont(self.h1_font)
-        self.grid.addWidget(label, i, 2, 3, 1)
-
-        blank_space = QSpacerItem(
-            Style.h1_border,
-            0,
-            QSizePolicy.Minimum,
-            QSizePolicy.Minimum,
+        self.add_section("Boot Disk", self.boot_disk_model)
+
+        self.disks_model = RecordTableModel(
+            [
+                ("Name", "name"),
+                ("Serial Number", "serial_number"),
+                ("Model", "model"),
+                ("WWN", "wwn"),
+                ("Size", "size"),
+                ("Rotational", "rotational"),
+                ("Boot", "boot"),
+                ("Mount Points", "mount_points"),
+            ],
+            lambda disk: disk["name"],
+            self,
         )
-        self.grid.addItem(blank_space, i, 3)
-
-        for network in self.system_info["network"]:
-            label = QLabel("Name")
-            label.setFont(self.key_font)
-            self.grid.addWidget(label, i, 4)
-
-            blank_space = QSpacerItem(
-                Style.key_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 5)
-
-            label = QLabel(network["name"])
-            label.setFont(self.default_font)
-            self.grid.addWidget(label, i, 6)
-
-            blank_space = QSpacerItem(
-                Style.section_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 7)
-            i += 1
-
-            blank_space = QSpacerItem(
-                0,
-                Style.default_border,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 4)
-            i += 1
-
-            label = QLabel("IP")
-            label.setFont(self.key_font)
-            self.grid.addWidget(label, i, 4)
-
-            blank_space = QSpacerItem(
-                Style.key_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 5)
-
-            label = QLabel(network["ip"])
-            label.setFont(self.default_font)
-            self.grid.addWidget(label, i, 6)
-
-            blank_space = QSpacerItem(
-                Style.default_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 7)
-            i += 1
-
-            blank_space = QSpacerItem(
-                0,
-                Style.default_border,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 4)
-            i += 1
-
-            label = QLabel("MAC")
-            label.setFont(self.default_font)
-            label.setFont(self.key_font)
-            self.grid.addWidget(label, i, 4)
-
-            blank_space = QSpacerItem(
-                Style.key_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 5)
-
-            label = QLabel(network["mac"])
-            label.setFont(self.default_font)
-            self.grid.addWidget(label, i, 6)
-
-            blank_space = QSpacerItem(
-                Style.section_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 7)
-            i += 1
-
-            blank_space = QSpacerItem(
-                0,
-                Style.section_border,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 1)
-            i += 1
-
-        hline = QFrame()
-        hline.setFrameShape(QFrame.HLine)
-        hline.setFrameShadow(QFrame.Sunken)
-        self.grid.addWidget(hline, i, 1, 1, 7)
-        i += 1
-
-        blank_space = QSpacerItem(
-            0,
-            Style.section_border,
-            QSizePolicy.Minimum,
-            QSizePolicy.Minimum,
+        self.disks_label, self.disks_view = self.add_section(
+            "Disks", self.disks_model
         )
-        self.grid.addItem(blank_space, i, 1)
-        i += 1
 
-        blank_space = QSpacerItem(
-            Style.section_border,
-            0,
-            QSizePolicy.Minimum,
-            QSizePolicy.Minimum,
-        )
-        self.grid.addItem(blank_space, i, 1)
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)
+        self.progress.setMaximumWidth(Style.h1_border)
+        self.progress.hide()
+        self.statusBar().addPermanentWidget(self.progress)
 
-        label = QLabel("Boot Disk")
-        label.setFont(self.h1_font)
-        self.grid.addWidget(label, i, 2, 3, 1)
+        # a worker still collecting on exit must not signal a deleted widget
+        qApp.aboutToQuit.connect(self.on_quit)
 
-        blank_space = QSpacerItem(
-            Style.h1_border,
-            0,
-            QSizePolicy.Minimum,
-            QSizePolicy.Minimum,
-        )
-        self.grid.addItem(blank_space, i, 3)
-
-        if self.system_info["os"] == "Linux":
-            label = QLabel("Mount Point")
-            label.setFont(self.key_font)
-            self.grid.addWidget(label, i, 4)
-
-            blank_space = QSpacerItem(
-                Style.key_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 5)
-
-            label = QLabel(
-                self.system_info["boot_disk"]["mount_point"]
-            )
-            label.setFont(self.default_font)
-            self.grid.addWidget(label, i, 6)
-
-            blank_space = QSpacerItem(
-                Style.section_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 7)
-            i += 1
-
-            blank_space = QSpacerItem(
-                0,
-                Style.default_border,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 4)
-            i += 1
-
-            label = QLabel("Serial Number")
-            label.setFont(self.key_font)
-            self.grid.addWidget(label, i, 4)
-
-            blank_space = QSpacerItem(
-                Style.key_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 5)
-
-            label = QLabel(
-                self.system_info["boot_disk"]["serial_number"]
-            )
-            label.setFont(self.default_font)
-            self.grid.addWidget(label, i, 6)
+        if auto_refresh:
+            self.timer = QTimer(self)
+            self.timer.timeout.connect(self.on_auto_refresh)
+            self.timer.start(int(auto_refresh * 1000))
 
-        else:
-            label = QLabel("Device ID")
-            label.setFont(self.key_font)
-            self.grid.addWidget(label, i, 4)
-
-            blank_space = QSpacerItem(
-                Style.key_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 5)
-
-            label = QLabel(self.system_info["boot_disk"]["device_id"])
-            label.setFont(self.default_font)
-            self.grid.addWidget(label, i, 6)
-
-            blank_space = QSpacerItem(
-                Style.section_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 7)
-            i += 1
-
-            blank_space = QSpacerItem(
-                0,
-                Style.default_border,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 4)
-            i += 1
-
-            label = QLabel("Index")
-            label.setFont(self.key_font)
-            self.grid.addWidget(label, i, 4)
-
-            blank_space = QSpacerItem(
-                Style.key_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 5)
-
-            label = QLabel(
-                str(self.system_info["boot_disk"]["index"])
-            )
-            label.setFont(self.default_font)
-            self.grid.addWidget(label, i, 6)
-
-            blank_space = QSpacerItem(
-                Style.section_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 7)
-            i += 1
-
-            blank_space = QSpacerItem(
-                0,
-                Style.default_border,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 4)
-            i += 1
-
-            label = QLabel("Serial Number")
-            label.setFont(self.key_font)
-            self.grid.addWidget(label, i, 4)
-
-            blank_space = QSpacerItem(
-                Style.key_border,
-                0,
-                QSizePolicy.Minimum,
-                QSizePolicy.Minimum,
-            )
-            self.grid.addItem(blank_space, i, 5)
-
-            label = QLabel(
-                self.system_info["boot_disk"]["serial_number"]
-            )
-            label.setFont(self.default_font)
-            self.grid.addWidget(label, i, 6)
+        self.refresh()
 
-        blank_space = QSpacerItem(
-            Style.section_border,
-            0,
-            QSizePolicy.Minimum,
-            QSizePolicy.Minimum,
-        )
-        self.grid.addItem(blank_space, i, 7)
-        i += 1
+    def add_section(self, title, model):
+        label = QLabel(title)
+        label.setFont(self.h1_font)
+        self.layout.addWidget(label)
+
+        view = QTableView()
+        view.setModel(model)
+        view.setFont(self.default_font)
+        view.horizontalHeader().setFont(self.key_font)
+        view.horizontalHeader().setStretchLastSection(True)
+        view.verticalHeader().hide()
+        view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.layout.addWidget(view)
+        self.layout.addSpacing(Style.default_border)
+        return label, view
+
+    def refresh(self):
+        # collect on the thread pool so the event loop keeps running, and
+        # cancel a refresh that is still in progress
+        if self.worker is not None:
+            self.worker.cancel()
+        self.generation += 1
+        self.worker = CollectWorker(self.my_app, self.generation)
+        self.worker.signals.result.connect(self.on_result)
+        self.worker.signals.finished.connect(self.on_finished)
+        self.worker.signals.failed.connect(self.on_failed)
+        self.progress.show()
+        self.statusBar().showMessage("Collecting...")
+        self.pool.start(self.worker)
+
+    def on_auto_refresh(self):
+        # a slow collection is left to finish instead of being restarted
+        if self.worker is None:
+            self.refresh()
+
+    def on_quit(self):
+        if self.worker is not None:
+            self.worker.cancel()
+
+    def on_result(self, generation, name, value):
+        if generation != self.generation:
+            return
+        self.show_section(name, value)
+        self.statusBar().showMessage(f"Collecting... {name} done")
+
+    def on_finished(self, generation, system_info):
+        if generation != self.generation:
+            return
+        self.worker = None
+        self.progress.hide()
+        self.system_info = system_info
+        self.show_info()
 
-        blank_space = QSpacerItem(
-            0,
-            Style.section_border,
-            QSizePolicy.Minimum,
-            QSizePolicy.Minimum,
-        )
-        self.grid.addItem(blank_space, i, 1)
-        i += 1
+    def on_failed(self, generation, error):
+        if generation != self.generation:
+            return
+        self.worker = None
+        self.progress.hide()
+        self.statusBar().showMessage("Collection failed: " + error)
+
+    def show_section(self, name, value):
+        # the models only signal the rows that changed since the last refresh
+        if name == "network":
+            self.network_model.update(value or [])
+        elif name == "boot_disk":
+            # collection of the boot disk may have failed or timed out
+            self.boot_disk_model.update([value or {}])
+        elif name == "disks":
+            self.disks_model.update(value or [])
+            self.disks_label.setVisible(bool(value))
+            self.disks_view.setVisible(bool(value))
+
+    def show_info(self):
+        # sections which failed this time are emptied
+        for name in ["network", "boot_disk", "disks"]:
+            self.show_section(name, self.system_info.get(name))
 
         local_time = _convert_timezone(self.system_info["creation_time"])
         message = "Updated at " + str(local_time)
         self.statusBar().showMessage(message)
 
-        i += 1
-        self.grid.setColumnStretch(0, 1)
-        self.grid.setColumnStretch(8, 1)
-        self.grid.setRowStretch(i, 1)
-
     def on_save(self):
         output_file = QFileDialog.getSaveFileName(
             self,
@@ -490,14 +303,128 @@ class MyWidget(QMainWindow):
             directory="/",
         )
         output_path, file_type = output_file
-        if output_path != "":
+        if output_path != "" and self.system_info is not None:
             self.my_app.save_info(self.system_info, output_path)
 
+    def on_open_fleet_file(self):
+        input_path, file_type = QFileDialog.getOpenFileName(
+            self,
+            filter="Snapshots (*.json *.ndjson *.jsonl);;All Files (*)",
+        )
+        if input_path != "":
+            FleetWindow([input_path], self.my_app.my_system, self)
+
+    def on_open_fleet_directory(self):
+        input_path = QFileDialog.getExistingDirectory(self)
+        if input_path != "":
+            FleetWindow([input_path], self.my_app.my_system, self)
+
     def on_about(self):
-        dialog = AboutDialog(self.paths, self.system_info["os"], self)
+        dialog = AboutDialog(self.paths, self.my_app.my_system, self)
         dialog.exec_()
 
 
+class FleetWindow(QMainWindow):
+    def __init__(self, inputs, os, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle("Xincapio - " + ", ".join(inputs))
+        self.resize(1100, 700)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+
+        self.default_font = QFont()
+        self.default_font.setPointSize(Style.default_font)
+        if os == "Windows":
+            self.default_font.setFamily(Style.default_typeface_win)
+
+        # snapshots are parsed on a thread and fetched as the view scrolls
+        self.loader = FleetLoader(inputs, self)
+        self.model = FleetModel(self.loader, _convert_timezone, self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setSortRole(Qt.UserRole)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.proxy.setFilterKeyColumn(HOST)
+
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+        self.layout = QVBoxLayout(self.central_widget)
+
+        filter_layout = QHBoxLayout()
+        self.filter_column = QComboBox()
+        self.filter_column.setFont(self.default_font)
+        for column in [
+            HOST,
+            MAC,
+            IP,
+            SERIAL_NUMBER,
+        ]:
+            self.filter_column.addItem(COLUMNS[column], column)
+        self.filter_column.currentIndexChanged.connect(self.on_filter_column)
+        filter_layout.addWidget(self.filter_column)
+
+        self.filter_text = QLineEdit()
+        self.filter_text.setFont(self.default_font)
+        self.filter_text.setPlaceholderText("Filter")
+        self.filter_text.textChanged.connect(
+            self.proxy.setFilterFixedString
+        )
+        filter_layout.addWidget(self.filter_text)
+        self.layout.addLayout(filter_layout)
+
+        self.view = QTableView()
+        self.view.setModel(self.proxy)
+        self.view.setFont(self.default_font)
+        self.view.setSortingEnabled(True)
+        self.view.sortByColumn(-1, Qt.AscendingOrder)
+        self.view.horizontalHeader().setStretchLastSection(True)
+        self.view.verticalHeader().hide()
+        self.view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        # rows are the same height, so the view does not measure each one
+        self.view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.layout.addWidget(self.view)
+
+        self.loader.loaded.connect(self.on_loaded)
+        self.loader.failed.connect(self.on_failed)
+        self.loader.finished.connect(self.on_finished)
+        # Ctrl+Q quits without closing windows, and the loader is usually
+        # waiting for the view to fetch
+        qApp.aboutToQuit.connect(self.loader.stop)
+        self.statusBar().showMessage("Loading...")
+        self.show()
+        self.loader.start()
+
+    def on_filter_column(self, index):
+        self.proxy.setFilterKeyColumn(self.filter_column.itemData(index))
+
+    def on_loaded(self, rows):
+        # a view scrolled to the end, or filtered down to a few rows, keeps
+        # fetching as rows arrive
+        scroll_bar = self.view.verticalScrollBar()
+        if scroll_bar.value() == scroll_bar.maximum():
+            self.proxy.fetchMore(QModelIndex())
+        self.show_status("Loading...")
+
+    def on_failed(self, error):
+        self.statusBar().showMessage("Loading failed: " + error)
+
+    def on_finished(self):
+        if not self.loader.stopped:
+            self.show_status("Loaded.")
+
+    def show_status(self, state):
+        loaded = self.model.rowCount() + len(self.model.pending)
+        shown = self.proxy.rowCount()
+        self.statusBar().showMessage(
+            f"{state} {shown} of {loaded} snapshots shown."
+        )
+
+    def closeEvent(self, event):
+        self.loader.stop()
+        super().closeEvent(event)
+
+
 class AboutDialog(QDialog):
     def __init__(self, paths, os, parent=None):
         super().__init__(parent)
@@ -724,12 +651,11 @@ class AboutDialog(QDialog):
         QDesktopServices.openUrl(QUrl(url))
 
 
+# cached, because views convert the same visible cells on every repaint
+@functools.lru_cache(maxsize=4096)
 def _convert_timezone(from_time):
-    from_zone = tz.tzutc()
-    to_zone = tz.tzlocal()
-
     from_time = dt.strptime(from_time, Style.utc_datetime_fmt)
-    from_time = from_time.replace(tzinfo=from_zone)
-    to_time = from_time.astimezone(to_zone)
+    from_time = from_time.replace(tzinfo=_FROM_ZONE)
+    to_time = from_time.astimezone(_TO_ZONE)
     to_time = to_time.strftime(Style.local_datetime_fmt)
     return to_time
@@ -0,0 +1,203 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import bisect
+import csv
+import json
+import mmap
+import struct
+
+# magic, version, number of 24, 28 and 36 bit prefixes, number of vendors and
+# size of the vendor names, padded to 32 bytes so that sections are 8 byte
+# aligned
+HEADER = struct.Struct("<4sHxxIIIII4x")
+MAGIC = b"XOUI"
+VERSION = 2
+# most specific first, MA-S, MA-M and MA-L assignments of the IEEE registry
+PREFIX_BITS = (36, 28, 24)
+MAC_BITS = 48
+
+
+def compile_registry(csv_paths, output):
+    # the IEEE registry CSV files have Registry, Assignment,
+    # Organization Name and Organization Address columns
+    prefixes = {bits: {} for bits in PREFIX_BITS}
+    vendors = {}
+    for csv_path in csv_paths:
+        with open(csv_path, encoding="utf-8", newline="") as fin:
+            for row in csv.DictReader(fin):
+                assignment = row["Assignment"].strip()
+                bits = len(assignment) * 4
+                if bits not in prefixes:
+                    continue
+                name = row["Organization Name"].strip()
+                vendor = vendors.setdefault(name, len(vendors))
+                prefixes[bits][int(assignment, 16)] = vendor
+
+    names = [name.encode("utf-8") for name in vendors]
+    offsets = [0]
+    for name in names:
+        offsets.append(offsets[-1] + len(name))
+    blob = b"".join(names)
+
+    with open(output, "wb") as fout:
+        fout.write(
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                *(len(prefixes[bits]) for bits in PREFIX_BITS),
+                len(names),
+                len(blob),
+            )
+        )
+        for bits in PREFIX_BITS:
+            keys = sorted(prefixes[bits])
+            fout.write(struct.pack(f"<{len(keys)}Q", *keys))
+            values = [prefixes[bits][key] for key in keys]
+            # keep the next section 8 byte aligned
+            if len(values) % 2:
+                values.append(0)
+            fout.write(struct.pack(f"<{len(values)}I", *values))
+        fout.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        fout.write(blob)
+    return len(names)
+
+
+class OuiTable:
+    def __init__(self, path):
+        with open(path, "rb") as fin:
+            self.mm = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.mm)
+        magic, version, *counts, vendor_count, blob_size = HEADER.unpack_from(
+            view
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' is not a compiled OUI table.")
+
+        offset = HEADER.size
+        self.sections = []
+        for bits, count in zip(PREFIX_BITS, counts):
+            keys = view[offset : offset + count * 8].cast("Q")
+            offset += count * 8
+            values = view[offset : offset + count * 4].cast("I")
+            offset += (count + count % 2) * 4
+            self.sections.append((bits, keys, values))
+        self.offsets = view[offset : offset + (vendor_count + 1) * 4].cast(
+            "I"
+        )
+        offset += (vendor_count + 1) * 4
+        self.blob = view[offset : offset + blob_size]
+
+    def lookup(self, mac):
+        value = mac_to_int(mac)
+        if value is None:
+            return None
+        for bits, keys, values in self.sections:
+            prefix = value >> (MAC_BITS - bits)
+            i = bisect.bisect_left(keys, prefix)
+            if i < len(keys) and keys[i] == prefix:
+                return self._vendor(values[i])
+        return None
+
+    def lookup_many(self, macs):
+        # sort the queries once and walk each sorted section alongside them,
+        # which is linear instead of a binary search per MAC
+        results = [None] * len(macs)
+        queries = sorted(
+            (value, i)
+            for i, value in enumerate(map(mac_to_int, macs))
+            if value is not None
+        )
+        for bits, keys, values in self.sections:
+            j = 0
+            shift = MAC_BITS - bits
+            for value, i in queries:
+                if results[i] is not None:
+                    continue
+                prefix = value >> shift
+                while j < len(keys) and keys[j] < prefix:
+                    j += 1
+                if j == len(keys):
+                    break
+                if keys[j] == prefix:
+                    results[i] = values[j]
+        return [
+            None if vendor is None else self._vendor(vendor)
+            for vendor in results
+        ]
+
+    def enrich(self, networks):
+        vendors = self.lookup_many([network["mac"] for network in networks])
+        for network, vendor in zip(networks, vendors):
+            network["vendor"] = vendor
+            network["locally_administered"] = is_locally_administered(
+                network["mac"]
+            )
+        return networks
+
+    def _vendor(self, vendor):
+        start = self.offsets[vendor]
+        end = self.offsets[vendor + 1]
+        return bytes(self.blob[start:end]).decode("utf-8")
+
+
+def mac_to_int(mac):
+    digits = mac.replace(":", "").replace("-", "")
+    if len(digits) != 12:
+        return None
+    try:
+        return int(digits, 16)
+    except ValueError:
+        return None
+
+
+def is_locally_administered(mac):
+    # the second least significant bit of the first octet, set on MACs made
+    # up by hypervisors, containers and randomizing clients
+    value = mac_to_int(mac)
+    if value is None:
+        return None
+    return bool(value >> 40 & 0x02)
+
+
+def enrich_file(table, inputs, fout, batch=10000):
+    # local library
+    import dataset
+
+    pending = []
+
+    def flush():
+        networks = [
+            network
+            for snapshot in pending
+            for network in snapshot.get("network") or []
+        ]
+        table.enrich(networks)
+        for snapshot in pending:
+            fout.write(json.dumps(snapshot, separators=(",", ":")) + "\n")
+        pending.clear()
+
+    count = 0
+    for _, _, snapshot in dataset.iter_valid_records(inputs):
+        pending.append(snapshot)
+        count += 1
+        if len(pending) >= batch:
+            flush()
+    flush()
+    return count
@@ -0,0 +1,107 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import heapq
+import os
+import zlib
+
+
+class Partitioner:
+    # spreads tab separated lines over files by a stable hash of their first
+    # field, so every line with the same key ends up in the same partition
+    def __init__(self, directory, count):
+        self.paths = [
+            os.path.join(directory, f"partition.{i}") for i in range(count)
+        ]
+        self.files = [None] * count
+
+    def write(self, key, line):
+        i = zlib.crc32(key.encode("utf-8")) % len(self.paths)
+        fout = self.files[i]
+        if fout is None:
+            fout = self.files[i] = open(self.paths[i], "w", encoding="utf-8")
+        fout.write(line)
+
+    def close(self):
+        for fout in self.files:
+            if fout is not None:
+                fout.close()
+        self.files = [None] * len(self.paths)
+
+    def __iter__(self):
+        return (path for path in self.paths if os.path.exists(path))
+
+
+def iter_sorted(path, max_bytes):
+    # sort in memory when the partition fits, otherwise sort runs of it and
+    # merge them from disk
+    if os.path.getsize(path) <= max_bytes:
+        with open(path, encoding="utf-8") as fin:
+            lines = fin.readlines()
+        lines.sort()
+        yield from lines
+        return
+
+    runs = []
+
+    def write_run(lines):
+        lines.sort()
+        run = f"{path}.run.{len(runs)}"
+        with open(run, "w", encoding="utf-8") as fout:
+            fout.writelines(lines)
+        runs.append(run)
+
+    # runs are filled up to max_bytes of lines, which may be whole snapshots
+    # of several megabytes, and hold at least one line
+    with open(path, encoding="utf-8") as fin:
+        lines = []
+        size = 0
+        for line in fin:
+            if lines and size + len(line) > max_bytes:
+                write_run(lines)
+                lines = []
+                size = 0
+            lines.append(line)
+            size += len(line)
+        if lines:
+            write_run(lines)
+    files = [open(run, encoding="utf-8") for run in runs]
+    try:
+        yield from heapq.merge(*files)
+    finally:
+        for fin in files:
+            fin.close()
+        for run in runs:
+            os.unlink(run)
+
+
+def iter_groups(lines):
+    # group consecutive lines of sorted input by their first field
+    key = None
+    group = []
+    for line in lines:
+        fields = line.rstrip("\n").split("\t")
+        if fields[0] != key:
+            if group:
+                yield key, group
+            key = fields[0]
+            group = []
+        group.append(fields[1:])
+    if group:
+        yield key, group
@@ -0,0 +1,146 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import json
+import os
+import sys
+import threading
+import time
+
+_enabled = False
+_lock = threading.Lock()
+# (name, category, start, end, thread), times from time.monotonic_ns
+_spans = []
+
+
+class _Span:
+    __slots__ = ("name", "category", "start")
+
+    def __init__(self, name, category):
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.start = time.monotonic_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.monotonic_ns()
+        with _lock:
+            _spans.append(
+                (
+                    self.name,
+                    self.category,
+                    self.start,
+                    end,
+                    threading.get_ident(),
+                )
+            )
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_null_span = _NullSpan()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+    start = _get_process_start()
+    if start is not None:
+        add("startup", "main", start, time.monotonic_ns())
+
+
+def span(name, category="main"):
+    # when profiling is off this is a global lookup and a shared no-op span
+    if not _enabled:
+        return _null_span
+    return _Span(name, category)
+
+
+def add(name, category, start, end):
+    with _lock:
+        _spans.append((name, category, start, end, threading.get_ident()))
+
+
+def get_spans():
+    with _lock:
+        return sorted(_spans, key=lambda span: (span[2], -span[3]))
+
+
+def print_report(fout=sys.stderr):
+    spans = get_spans()
+    if not spans:
+        return
+    origin = spans[0][2]
+    threads = {}
+    print(f"{'start ms':>10} {'duration ms':>12}  thread  span", file=fout)
+    for name, category, start, end, thread in spans:
+        number = threads.setdefault(thread, len(threads))
+        print(
+            f"{(start - origin) / 1e6:10.3f} {(end - start) / 1e6:12.3f}  "
+            f"{number:>6}  {name}",
+            file=fout,
+        )
+
+
+def write_trace(path):
+    # Chrome trace event format, for chrome://tracing and Perfetto
+    spans = get_spans()
+    origin = spans[0][2] if spans else 0
+    pid = os.getpid()
+    events = [
+        {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - origin) / 1000,
+            "dur": (end - start) / 1000,
+            "pid": pid,
+            "tid": thread,
+        }
+        for name, category, start, end, thread in spans
+    ]
+    with open(path, "w", encoding="utf-8") as fout:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fout)
+
+
+def _get_process_start():
+    # interpreter startup happens before any timer can run, so it is the time
+    # since the kernel started the process, in clock ticks since boot
+    if not hasattr(time, "CLOCK_BOOTTIME"):
+        return None
+    try:
+        with open("/proc/self/stat", encoding="utf-8") as fin:
+            # the command name may contain spaces, fields follow its ')'
+            fields = fin.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    started = int(fields[19]) * 1_000_000_000 // os.sysconf("SC_CLK_TCK")
+    since_start = time.clock_gettime_ns(time.CLOCK_BOOTTIME) - started
+    return time.monotonic_ns() - since_start
@@ -0,0 +1,176 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import socket
+
+
+class NetworkInterface:
+    # extra holds the optional keys, e.g. vendor and locally_administered
+    # from OUI enrichment, or None
+    __slots__ = ("name", "_ip", "_mac", "extra")
+
+    def __init__(self, name, ip, mac, packed=False, extra=None):
+        self.name = name
+        self.extra = extra
+        # packed addresses are kept as bytes, unless packing would change
+        # how they are written, e.g. an upper case Windows MAC
+        self._ip = pack_ip(ip) if packed else ip
+        self._mac = pack_mac(mac) if packed else mac
+
+    @property
+    def ip(self):
+        if isinstance(self._ip, bytes):
+            return unpack_ip(self._ip)
+        return self._ip
+
+    @property
+    def mac(self):
+        if isinstance(self._mac, bytes):
+            return unpack_mac(self._mac)
+        return self._mac
+
+    @classmethod
+    def from_dict(cls, network, packed=False):
+        extra = {
+            key: value
+            for key, value in network.items()
+            if key not in ("name", "ip", "mac")
+        }
+        return cls(
+            network["name"],
+            network["ip"],
+            network["mac"],
+            packed,
+            extra or None,
+        )
+
+    def to_dict(self):
+        network = {"name": self.name, "ip": self.ip, "mac": self.mac}
+        if self.extra:
+            network.update(self.extra)
+        return network
+
+
+class BootDisk:
+    # Linux has mount_point, Windows has device_id and index, both have
+    # serial_number; fields which are None are not in the dictionary
+    __slots__ = ("mount_point", "device_id", "index", "serial_number")
+
+    def __init__(
+        self, serial_number, mount_point=None, device_id=None, index=None
+    ):
+        self.serial_number = serial_number
+        self.mount_point = mount_point
+        self.device_id = device_id
+        self.index = index
+
+    @classmethod
+    def from_dict(cls, boot_disk):
+        return cls(
+            boot_disk.get("serial_number"),
+            boot_disk.get("mount_point"),
+            boot_disk.get("device_id"),
+            boot_disk.get("index"),
+        )
+
+    def to_dict(self):
+        if self.mount_point is not None:
+            return {
+                "mount_point": self.mount_point,
+                "serial_number": self.serial_number,
+            }
+        return {
+            "device_id": self.device_id,
+            "index": self.index,
+            "serial_number": self.serial_number,
+        }
+
+
+class Snapshot:
+    # extra holds the less common keys, e.g. disks and errors, or None
+    __slots__ = ("os", "creation_time", "network", "boot_disk", "extra")
+
+    def __init__(self, os, creation_time, network, boot_disk, extra=None):
+        self.os = os
+        self.creation_time = creation_time
+        self.network = network
+        self.boot_disk = boot_disk
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, system_info, packed=False):
+        extra = {
+            key: value
+            for key, value in system_info.items()
+            if key not in cls.__slots__
+        }
+        network = system_info.get("network")
+        if network is not None:
+            network = [
+                NetworkInterface.from_dict(interface, packed)
+                for interface in network
+            ]
+        boot_disk = system_info.get("boot_disk")
+        if boot_disk is not None:
+            boot_disk = BootDisk.from_dict(boot_disk)
+        return cls(
+            system_info["os"],
+            system_info["creation_time"],
+            network,
+            boot_disk,
+            extra or None,
+        )
+
+    def to_dict(self):
+        system_info = {"os": self.os, "creation_time": self.creation_time}
+        if self.network is not None:
+            system_info["network"] = [
+                interface.to_dict() for interface in self.network
+            ]
+        if self.boot_disk is not None:
+            system_info["boot_disk"] = self.boot_disk.to_dict()
+        if self.extra:
+            system_info.update(self.extra)
+        return system_info
+
+
+def pack_ip(ip):
+    family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+    try:
+        packed = socket.inet_pton(family, ip)
+    except (OSError, ValueError):
+        return ip
+    return packed if socket.inet_ntop(family, packed) == ip else ip
+
+
+def unpack_ip(packed):
+    family = socket.AF_INET6 if len(packed) == 16 else socket.AF_INET
+    return socket.inet_ntop(family, packed)
+
+
+def pack_mac(mac):
+    try:
+        packed = bytes.fromhex(mac.replace(":", ""))
+    except ValueError:
+        return mac
+    return packed if unpack_mac(packed) == mac else mac
+
+
+def unpack_mac(packed):
+    return ":".join(f"{octet:02x}" for octet in packed)
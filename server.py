@@ -0,0 +1,204 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import hashlib
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+
+class Snapshot:
+    def __init__(self, system_info):
+        self.system_info = system_info
+        self.content = _dumps(_without_creation_time(system_info))
+        self.body = _dumps(system_info)
+        self.etag = _etag(self.body)
+        self.selections = {}
+
+    def select(self, fields):
+        # rendered selections are kept, because the same few field sets are
+        # requested over and over. Unknown fields are left out of the key,
+        # so clients cannot grow the cache beyond the subsets of the fields
+        key = tuple(sorted(set(fields) & self.system_info.keys()))
+        selection = self.selections.get(key)
+        if selection is None:
+            body = _dumps({field: self.system_info[field] for field in key})
+            selection = (body, _etag(body))
+            self.selections[key] = selection
+        return selection
+
+
+class Agent:
+    def __init__(self, my_app, interval):
+        self.my_app = my_app
+        self.interval = interval
+        self.snapshot = Snapshot(self.my_app.get_info())
+        self.stopped = threading.Event()
+
+    def refresh(self):
+        try:
+            system_info = self.my_app.get_info()
+        except Exception as error:
+            print(f"Failed to refresh: {error}", file=sys.stderr)
+            return
+        snapshot = Snapshot(system_info)
+        # keep the current snapshot, and so its ETag, if only the creation
+        # time changed
+        if snapshot.content != self.snapshot.content:
+            self.snapshot = snapshot
+
+    def refresh_forever(self):
+        while not self.stopped.wait(self.interval):
+            self.refresh()
+
+    def stop(self):
+        self.stopped.set()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "Xincapio"
+    # buffer the response, so that the headers and the body are sent in one
+    # segment instead of waiting for delayed acks between them
+    wbufsize = -1
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path not in ("/", "/info"):
+            self.send_body(404, b'{"error": "not found"}', None)
+            return
+
+        snapshot = self.server.agent.snapshot
+        fields = [
+            field
+            for value in parse_qs(url.query).get("fields", [])
+            for field in value.split(",")
+            if field
+        ]
+        if fields:
+            body, etag = snapshot.select(fields)
+        else:
+            body, etag = snapshot.body, snapshot.etag
+
+        if self.headers.get("If-None-Match") in (etag, "*"):
+            self.send_body(304, b"", etag)
+        else:
+            self.send_body(200, body, etag)
+
+    def send_body(self, code, body, etag):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if code != 304:
+            self.wfile.write(body)
+
+    def address_string(self):
+        # unix socket clients have no address
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+
+    class UnixHTTPServer(
+        socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+    ):
+        daemon_threads = True
+
+        def server_bind(self):
+            path = Path(self.server_address)
+            if path.is_socket():
+                path.unlink()
+            elif not path.parent.exists():
+                Path.mkdir(path.parent, parents=True)
+            super().server_bind()
+
+
+class LocalHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def get_default_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "xincapio.sock"
+    return Path("/run/xincapio.sock")
+
+
+def serve(my_app, socket_path, port, interval):
+    agent = Agent(my_app, interval)
+    servers = []
+    if socket_path and hasattr(socketserver, "UnixStreamServer"):
+        servers.append(UnixHTTPServer(str(socket_path), RequestHandler))
+    if port:
+        servers.append(LocalHTTPServer(("127.0.0.1", port), RequestHandler))
+    if not servers:
+        print("Nothing to serve, specify a socket path or a port.")
+        return
+
+    threads = [threading.Thread(target=agent.refresh_forever, daemon=True)]
+    for server in servers:
+        server.agent = agent
+        threads.append(
+            threading.Thread(target=server.serve_forever, daemon=True)
+        )
+    for thread in threads:
+        thread.start()
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: agent.stop())
+    try:
+        while not agent.stopped.wait(1):
+            pass
+    except KeyboardInterrupt:
+        agent.stop()
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+        if socket_path and Path(socket_path).is_socket():
+            Path(socket_path).unlink()
+
+
+def _without_creation_time(system_info):
+    return {
+        key: value
+        for key, value in system_info.items()
+        if key != "creation_time"
+    }
+
+
+def _dumps(obj):
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
@@ -0,0 +1,228 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import hashlib
+import heapq
+import mmap
+import os
+import socket
+import struct
+import sys
+from pathlib import Path
+
+# local library
+import dataset
+
+# entries are sorted by key, followed by the source id and the offset of the
+# record in the source; big-endian so that bytes order is key order
+ENTRIES = {
+    "mac": struct.Struct(">6sIQ"),
+    "ip": struct.Struct(">16sIQ"),
+    "serial": struct.Struct(">16sIQ"),
+}
+
+# entries kept in memory before a sorted segment is written
+SEGMENT_ENTRIES = 1 << 20
+# segments of a kind are merged into one when there are more than this
+MAX_SEGMENTS = 8
+
+
+class SnapshotIndex:
+    # sources.txt lists the indexed files, one per line, and
+    # <kind>.<number>.idx are sorted segments of fixed-width entries
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.sources_path = self.directory / "sources.txt"
+
+    def build(self, inputs, append=False):
+        if not self.directory.exists():
+            Path.mkdir(self.directory, parents=True)
+        if not append:
+            for path in self.directory.glob("*.idx"):
+                path.unlink()
+            if self.sources_path.exists():
+                self.sources_path.unlink()
+
+        sources = self.get_sources()
+        indexed = set(sources)
+        buffers = {kind: [] for kind in ENTRIES}
+        count = 0
+        with open(self.sources_path, "a", encoding="utf-8") as fout:
+            for path in dataset.iter_paths(inputs):
+                path = os.path.abspath(path)
+                if path in indexed:
+                    continue
+                source = len(sources)
+                sources.append(path)
+                indexed.add(path)
+                fout.write(path + "\n")
+                try:
+                    for offset, snapshot in dataset.iter_file(path):
+                        # a malformed record is skipped as a whole, so it
+                        # is never half indexed
+                        try:
+                            keys = list(iter_keys(snapshot))
+                        except (AttributeError, KeyError, TypeError) as error:
+                            print(
+                                f"{path}: offset {offset}: invalid snapshot "
+                                f"({error!r})",
+                                file=sys.stderr,
+                            )
+                            continue
+                        for kind, key in keys:
+                            buffers[kind].append(
+                                ENTRIES[kind].pack(key, source, offset)
+                            )
+                        count += 1
+                except (OSError, ValueError) as error:
+                    print(f"{path}: {error}", file=sys.stderr)
+                for kind, entries in buffers.items():
+                    if len(entries) >= SEGMENT_ENTRIES:
+                        self._write_segment(kind, entries)
+                        buffers[kind] = []
+        for kind, entries in buffers.items():
+            if entries:
+                self._write_segment(kind, entries)
+            if len(self.get_segments(kind)) > MAX_SEGMENTS:
+                self.compact(kind)
+        return count
+
+    def query(self, kind, value):
+        key = pack_key(kind, value)
+        sources = self.get_sources()
+        locations = []
+        for segment in self.get_segments(kind):
+            locations.extend(_search(segment, ENTRIES[kind], key))
+        return sorted(
+            {(sources[source], offset) for source, offset in locations}
+        )
+
+    def compact(self, kind):
+        segments = self.get_segments(kind)
+        entry = ENTRIES[kind]
+        files = [open(segment, "rb") for segment in segments]
+        try:
+            streams = [_iter_entries(fin, entry.size) for fin in files]
+            self._write_segment(kind, heapq.merge(*streams), presorted=True)
+        finally:
+            for fin in files:
+                fin.close()
+        for segment in segments:
+            segment.unlink()
+
+    def get_sources(self):
+        try:
+            with open(self.sources_path, encoding="utf-8") as fin:
+                return fin.read().splitlines()
+        except OSError:
+            return []
+
+    def get_segments(self, kind):
+        return sorted(
+            self.directory.glob(f"{kind}.*.idx"),
+            key=lambda path: int(path.name.split(".")[1]),
+        )
+
+    def _write_segment(self, kind, entries, presorted=False):
+        segments = self.get_segments(kind)
+        number = int(segments[-1].name.split(".")[1]) + 1 if segments else 0
+        if not presorted:
+            entries.sort()
+        path = self.directory / f"{kind}.{number}.idx"
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "wb") as fout:
+            for entry in entries:
+                fout.write(entry)
+        os.replace(temp_path, path)
+
+
+def iter_keys(snapshot):
+    for network in snapshot.get("network") or []:
+        # InfiniBand and tunnel interfaces have hardware addresses which are
+        # not 6 bytes, they are not indexed
+        if network["mac"] not in dataset.IGNORED_MACS:
+            try:
+                yield "mac", pack_key("mac", network["mac"])
+            except ValueError:
+                pass
+        try:
+            yield "ip", pack_key("ip", network["ip"])
+        except ValueError:
+            pass
+    serial_number = dataset.get_serial_number(snapshot)
+    if serial_number:
+        yield "serial", pack_key("serial", serial_number)
+
+
+def pack_key(kind, value):
+    if kind == "mac":
+        try:
+            key = bytes.fromhex(value.replace(":", "").replace("-", ""))
+        except ValueError:
+            key = b""
+        if len(key) != 6:
+            raise ValueError(f"Invalid MAC address '{value}'.")
+        return key
+    if kind == "ip":
+        # IPv4 addresses are stored as IPv4-mapped IPv6 addresses
+        try:
+            if ":" in value:
+                return socket.inet_pton(socket.AF_INET6, value)
+            return b"\0" * 10 + b"\xff\xff" + socket.inet_pton(
+                socket.AF_INET, value
+            )
+        except OSError:
+            raise ValueError(f"Invalid IP address '{value}'.") from None
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+
+
+def _search(path, entry, key):
+    if path.stat().st_size == 0:
+        return []
+    size = entry.size
+    key_size = len(key)
+    with open(path, "rb") as fin:
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # lower bound of the key by binary search
+            low, high = 0, len(mm) // size
+            while low < high:
+                middle = (low + high) // 2
+                position = middle * size
+                if mm[position : position + key_size] < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            locations = []
+            position = low * size
+            while (
+                position < len(mm)
+                and mm[position : position + key_size] == key
+            ):
+                _, source, offset = entry.unpack_from(mm, position)
+                locations.append((source, offset))
+                position += size
+            return locations
+
+
+def _iter_entries(fin, size):
+    while True:
+        entry = fin.read(size)
+        if len(entry) < size:
+            return
+        yield entry
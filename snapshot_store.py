@@ -0,0 +1,110 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class SnapshotStore:
+    # objects/<hash[:2]>/<hash>.json holds each distinct content once, and
+    # hosts/<host>.json points to the latest content of a host
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.objects = self.directory / "objects"
+        self.hosts = self.directory / "hosts"
+
+    def save(self, system_info, host):
+        content = normalize(system_info)
+        digest = get_digest(content)
+        pointer_path = self.get_pointer_path(host)
+        pointer = self.load_pointer(host)
+        if pointer is not None and pointer["hash"] == digest:
+            return False
+
+        object_path = self.get_object_path(digest)
+        if not object_path.exists():
+            write_atomic(object_path, content)
+        pointer = {
+            "hash": digest,
+            "creation_time": system_info.get("creation_time"),
+        }
+        write_atomic(pointer_path, json.dumps(pointer).encode("utf-8"))
+        return True
+
+    def load(self, host):
+        pointer = self.load_pointer(host)
+        if pointer is None:
+            return None
+        with open(self.get_object_path(pointer["hash"]), "rb") as fin:
+            system_info = json.loads(fin.read())
+        system_info["creation_time"] = pointer["creation_time"]
+        return system_info
+
+    def load_pointer(self, host):
+        try:
+            with open(self.get_pointer_path(host), "rb") as fin:
+                return json.loads(fin.read())
+        except (OSError, ValueError):
+            return None
+
+    def get_pointer_path(self, host):
+        return self.hosts / (host.replace(os.sep, "_") + ".json")
+
+    def get_object_path(self, digest):
+        return self.objects / digest[:2] / (digest + ".json")
+
+
+def normalize(system_info):
+    # the creation time changes on every run, so it is not part of the
+    # content; sorted keys make equal content serialize to equal bytes
+    content = {
+        key: value
+        for key, value in system_info.items()
+        if key != "creation_time"
+    }
+    data = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return data.encode("utf-8")
+
+
+def get_digest(content):
+    return hashlib.blake2b(content, digest_size=32).hexdigest()
+
+
+def write_atomic(path, data):
+    # readers see either the old or the new file, also on NFS where the
+    # rename is atomic on the server
+    path = Path(path)
+    if not path.parent.exists():
+        Path.mkdir(path.parent, parents=True, exist_ok=True)
+    temp_path = path.with_name(
+        f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        with open(temp_path, "wb") as fout:
+            fout.write(data)
+            fout.flush()
+            os.fsync(fout.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if temp_path.exists():
+            temp_path.unlink()
+        raise
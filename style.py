@@ -0,0 +1,34 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+class Style:
+    utc_datetime_fmt = "%Y-%m-%dT%H:%M:%S.%fZ"
+    local_datetime_fmt = "%Y-%m-%d %H:%M:%S.%f"
+
+    default_typeface_win = "Segoe UI"
+    mono_typeface_win = "Consolas"
+    mono_typeface_linux = "DejaVu Sans Mono"
+
+    default_font = 10
+    h1_font = 18
+
+    default_border = 10
+    h1_border = 100
+    key_border = 30
+    section_border = 25
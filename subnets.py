@@ -0,0 +1,183 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import bisect
+import ipaddress
+import socket
+from array import array
+
+# local library
+import dataset
+
+
+class AddressColumns:
+    # addresses are kept as sorted arrays of unsigned integers with a
+    # parallel array of host ids; IPv6 addresses are split into the high and
+    # low 64 bits, as array has no 128 bit type
+    def __init__(self):
+        self.hosts = []
+        self.v4 = array("I")
+        self.v4_hosts = array("I")
+        self.v6_high = array("Q")
+        self.v6_low = array("Q")
+        self.v6_hosts = array("I")
+
+    @classmethod
+    def from_inputs(cls, inputs):
+        columns = cls()
+        host_ids = {}
+        v4 = array("Q")
+        v6 = []
+        for path, offset, snapshot in dataset.iter_valid_records(inputs):
+            identity = dataset.get_host_identity(snapshot)
+            host = host_ids.get(identity)
+            if host is None:
+                host = host_ids[identity] = len(columns.hosts)
+                columns.hosts.append(
+                    {"identity": identity, "source": path, "offset": offset}
+                )
+            for network in snapshot.get("network") or []:
+                try:
+                    version, address = pack_address(network["ip"])
+                except (OSError, ValueError):
+                    continue
+                if version == 4:
+                    v4.append(address << 32 | host)
+                else:
+                    v6.append((address, host))
+
+        # sorting the combined address and host sorts by address
+        for value in sorted(v4):
+            columns.v4.append(value >> 32)
+            columns.v4_hosts.append(value & 0xFFFFFFFF)
+        v6.sort()
+        for address, host in v6:
+            columns.v6_high.append(address >> 64)
+            columns.v6_low.append(address & 0xFFFFFFFFFFFFFFFF)
+            columns.v6_hosts.append(host)
+        return columns
+
+    def find_hosts(self, cidr):
+        network = ipaddress.ip_network(cidr, strict=False)
+        first = int(network.network_address)
+        last = int(network.broadcast_address)
+        if network.version == 4:
+            start = bisect.bisect_left(self.v4, first)
+            end = bisect.bisect_right(self.v4, last)
+            hosts = self.v4_hosts[start:end]
+            addresses = (
+                (socket.inet_ntoa(self.v4[i].to_bytes(4, "big")), host)
+                for i, host in zip(range(start, end), hosts)
+            )
+        else:
+            start = self._bisect_v6(first, right=False)
+            end = self._bisect_v6(last, right=True)
+            addresses = (
+                (self._format_v6(i), self.v6_hosts[i])
+                for i in range(start, end)
+            )
+
+        # a host has the same address in each of its snapshots
+        found = {}
+        for ip, host in addresses:
+            found.setdefault(host, {})[ip] = None
+        return [
+            dict(self.hosts[host], ips=list(ips))
+            for host, ips in found.items()
+        ]
+
+    def get_usage(self, prefix_v4=24, prefix_v6=64):
+        # one pass over the sorted addresses, which are grouped by subnet
+        usage = []
+        usage.extend(
+            _count(
+                zip(self.v4, self.v4_hosts),
+                ipaddress.IPv4Network,
+                ipaddress.IPV4LENGTH,
+                prefix_v4,
+            )
+        )
+        usage.extend(
+            _count(
+                zip(self._iter_v6(), self.v6_hosts),
+                ipaddress.IPv6Network,
+                ipaddress.IPV6LENGTH,
+                prefix_v6,
+            )
+        )
+        return usage
+
+    def _bisect_v6(self, address, right):
+        high = address >> 64
+        low = address & 0xFFFFFFFFFFFFFFFF
+        lo, hi = 0, len(self.v6_high)
+        while lo < hi:
+            middle = (lo + hi) // 2
+            key = (self.v6_high[middle], self.v6_low[middle])
+            if key < (high, low) or (right and key == (high, low)):
+                lo = middle + 1
+            else:
+                hi = middle
+        return lo
+
+    def _iter_v6(self):
+        for high, low in zip(self.v6_high, self.v6_low):
+            yield high << 64 | low
+
+    def _format_v6(self, i):
+        address = self.v6_high[i] << 64 | self.v6_low[i]
+        return socket.inet_ntop(socket.AF_INET6, address.to_bytes(16, "big"))
+
+
+def pack_address(ip):
+    if ":" in ip:
+        # drop the zone of link-local addresses, e.g. fe80::1%eth0
+        packed = socket.inet_pton(socket.AF_INET6, ip.split("%")[0])
+        return 6, int.from_bytes(packed, "big")
+    return 4, int.from_bytes(socket.inet_aton(ip), "big")
+
+
+def _count(rows, network_class, bits, prefix):
+    shift = bits - prefix
+    current = None
+    addresses = set()
+    hosts = set()
+    for address, host in rows:
+        subnet = address >> shift
+        if subnet != current:
+            if current is not None:
+                network = network_class((current << shift, prefix))
+                yield _usage(network, addresses, hosts)
+            current = subnet
+            addresses = set()
+            hosts = set()
+        addresses.add(address)
+        hosts.add(host)
+    if current is not None:
+        network = network_class((current << shift, prefix))
+        yield _usage(network, addresses, hosts)
+
+
+def _usage(network, addresses, hosts):
+    return {
+        "subnet": str(network),
+        "addresses": len(addresses),
+        "hosts": len(hosts),
+        "utilization": len(addresses) / network.num_addresses,
+    }
@@ -0,0 +1,128 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# third party library
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QVariant
+
+
+class RecordTableModel(QAbstractTableModel):
+    # columns are (header, key) pairs and rows are identified by get_key, so
+    # that update can tell changed rows from inserted and removed ones
+    def __init__(self, columns, get_key, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.get_key = get_key
+        self.rows = []
+        self.keys = []
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return QVariant()
+        value = self.rows[index.row()].get(self.columns[index.column()][1])
+        if value is None:
+            return "Not available"
+        if isinstance(value, list):
+            return ", ".join(str(item) for item in value)
+        return str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return QVariant()
+        if orientation == Qt.Horizontal:
+            return self.columns[section][0]
+        return section + 1
+
+    def update(self, records):
+        # emit only the rows that were removed, inserted or changed, so the
+        # view repaints in proportion to the changes
+        keys = [self.get_key(record) for record in records]
+        new_keys = set(keys)
+
+        removed = [i for i, key in enumerate(self.keys) if key not in new_keys]
+        for first, last in reversed(_get_ranges(removed)):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.rows[first : last + 1]
+            del self.keys[first : last + 1]
+            self.endRemoveRows()
+
+        old_keys = set(self.keys)
+        kept = [key for key in keys if key in old_keys]
+        if kept != self.keys:
+            # rows were reordered, which is rare enough to just reset
+            self.beginResetModel()
+            self.rows = list(records)
+            self.keys = keys
+            self.endResetModel()
+            return
+
+        i = 0
+        inserted = []
+        for record, key in zip(records, keys):
+            if key not in old_keys:
+                inserted.append(record)
+                continue
+            if inserted:
+                self._insert(i, inserted)
+                i += len(inserted)
+                inserted = []
+            self._change(i, record)
+            i += 1
+        if inserted:
+            self._insert(i, inserted)
+
+    def _insert(self, row, records):
+        self.beginInsertRows(QModelIndex(), row, row + len(records) - 1)
+        self.rows[row:row] = records
+        self.keys[row:row] = [self.get_key(record) for record in records]
+        self.endInsertRows()
+
+    def _change(self, row, record):
+        old = self.rows[row]
+        self.rows[row] = record
+        changed = [
+            column
+            for column, (_, name) in enumerate(self.columns)
+            if old.get(name) != record.get(name)
+        ]
+        if changed:
+            self.dataChanged.emit(
+                self.index(row, changed[0]),
+                self.index(row, changed[-1]),
+                [Qt.DisplayRole],
+            )
+
+
+def _get_ranges(rows):
+    # sorted rows to (first, last) ranges of consecutive rows
+    ranges = []
+    for row in rows:
+        if ranges and ranges[-1][1] == row - 1:
+            ranges[-1] = (ranges[-1][0], row)
+        else:
+            ranges.append((row, row))
+    return ranges
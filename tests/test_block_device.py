@@ -0,0 +1,87 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+# standard library
+import os
+
+# third party library
+import pytest
+
+# local library
+from linux import block_device, paths
+
+
+@pytest.fixture
+def root(tmp_path):
+    yield tmp_path
+    paths.set_root("/")
+
+
+def make_tree(root, mountinfo):
+    st_dev = os.stat(root).st_dev
+    device = f"{os.major(st_dev)}:{os.minor(st_dev)}"
+    (root / "proc/self").mkdir(parents=True)
+    (root / "proc/self/mountinfo").write_text(
+        mountinfo.format(device=device)
+    )
+    partition = root / "sys/devices/pci0000:00/block/sda/sda2"
+    partition.mkdir(parents=True)
+    (partition / "partition").write_text("2\n")
+    for directory in ("sys/dev/block", "sys/class/block"):
+        (root / directory).mkdir(parents=True)
+    os.symlink(partition, root / "sys/dev/block" / device)
+    os.symlink(partition, root / "sys/class/block/sda2")
+    paths.set_root(str(root))
+
+
+def test_overlay_resolves_to_upper_directory_device(root):
+    # a container root, with the writable layer on an ext4 partition
+    (root / "var/lib/docker/overlay2/x/diff").mkdir(parents=True)
+    make_tree(
+        root,
+        "22 1 0:99 / / rw - overlay overlay rw,lowerdir=/var/lib/docker/"
+        "overlay2/l/A,upperdir=/var/lib/docker/overlay2/x/diff,"
+        "workdir=/var/lib/docker/overlay2/x/work\n"
+        "30 22 {device} / /var/lib/docker rw - ext4 /dev/sda2 rw\n",
+    )
+    mounts = block_device.get_mounts()
+    assert mounts[0]["fs_type"] == "overlay"
+    assert block_device.get_block_device(mounts[0], mounts) == "sda2"
+    assert block_device.get_parent_disks("sda2") == ["sda"]
+
+
+def test_overlay_without_visible_upper_directory(root):
+    make_tree(
+        root,
+        "22 1 0:99 / / rw - overlay overlay rw,upperdir=/missing\n"
+        "30 22 {device} / /var/lib/docker rw - ext4 /dev/sda2 rw\n",
+    )
+    mounts = block_device.get_mounts()
+    assert block_device.get_block_device(mounts[0], mounts) is None
+
+
+def test_overlay_upper_directory_on_overlay(root):
+    # stacked overlays must not recurse forever
+    (root / "upper").mkdir()
+    make_tree(
+        root,
+        "22 1 {device} / / rw - overlay overlay rw,upperdir=/upper\n",
+    )
+    mounts = block_device.get_mounts()
+    assert block_device.get_block_device(mounts[0], mounts) is None
@@ -0,0 +1,174 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import ctypes
+import errno
+import os
+
+# third party library
+import pytest
+
+# local library
+fcntl = pytest.importorskip("fcntl")
+from linux import identify  # noqa: E402
+from linux.identify import IdentifyEngine  # noqa: E402
+
+
+def make_ata_page(serial, firmware, model):
+    # struct hd_driveid as returned by HDIO_GET_IDENTITY, where libata has
+    # already put the strings in byte order: serial_no at byte 20, fw_rev at
+    # 46 and model at 54, space padded. The other words are filled with
+    # garbage so that a wrong offset shows up
+    page = bytearray(b"\xa5" * identify.ATA_IDENTITY_SIZE)
+    page[20:40] = serial.rjust(20)
+    page[46:54] = firmware.ljust(8)
+    page[54:94] = model.ljust(40)
+    return bytes(page)
+
+
+def make_nvme_page(serial, model, firmware):
+    # struct nvme_id_ctrl: vid and ssvid, then sn[20] at byte 4, mn[40] at
+    # 24 and fr[8] at 64, space padded
+    page = bytearray(b"\x5a" * identify.NVME_IDENTIFY_SIZE)
+    page[0:4] = b"\x4d\x14\x4d\x14"
+    page[4:24] = serial.ljust(20)
+    page[24:64] = model.ljust(40)
+    page[64:72] = firmware.ljust(8)
+    return bytes(page)
+
+
+ATA_PAGE = make_ata_page(
+    b"WD-WCC4N7HXYZ12", b"82.00A82", b"WDC WD40EFRX-68N32N0"
+)
+NVME_PAGE = make_nvme_page(
+    b"S4EWNX0R123456", b"Samsung SSD 970 EVO Plus 1TB", b"2B2QEXM7"
+)
+
+
+class FakeDevices:
+    # answers the identify ioctls with recorded pages, per device path
+    def __init__(self, pages, errors=None):
+        self.pages = pages
+        self.errors = errors or {}
+        self.paths = {}
+
+    def open_device(self, path):
+        if path not in self.pages and path not in self.errors:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT))
+        fd = os.open(os.devnull, os.O_RDONLY)
+        self.paths[fd] = path
+        return fd
+
+    def ioctl(self, fd, request, buf, mutate):
+        path = self.paths[fd]
+        if path in self.errors:
+            raise OSError(self.errors[path], os.strerror(self.errors[path]))
+        page = self.pages[path]
+        if request == identify.HDIO_GET_IDENTITY:
+            assert len(buf) == identify.ATA_IDENTITY_SIZE
+            buf[:] = page
+        elif request == identify.NVME_IOCTL_ADMIN_CMD:
+            command = identify.NVME_ADMIN_CMD.unpack(bytes(buf))
+            opcode, address, data_len, cdw10 = (
+                command[0],
+                command[7],
+                command[9],
+                command[10],
+            )
+            assert opcode == identify.NVME_ADMIN_IDENTIFY
+            assert cdw10 == identify.NVME_IDENTIFY_CNS_CTRL
+            assert data_len == identify.NVME_IDENTIFY_SIZE
+            # the kernel writes the page to the address in the command
+            ctypes.memmove(address, page, data_len)
+        else:
+            raise OSError(errno.ENOTTY, os.strerror(errno.ENOTTY))
+        return 0
+
+
+def make_engine(devices):
+    return IdentifyEngine(ioctl=devices.ioctl, open_device=devices.open_device)
+
+
+def test_identify_ata():
+    devices = FakeDevices({"/dev/sda": ATA_PAGE})
+    assert make_engine(devices).identify("/dev/sda") == {
+        "serial_number": "WD-WCC4N7HXYZ12",
+        "model": "WDC WD40EFRX-68N32N0",
+        "firmware": "82.00A82",
+    }
+
+
+def test_identify_nvme():
+    devices = FakeDevices({"/dev/nvme0n1": NVME_PAGE})
+    assert make_engine(devices).identify("/dev/nvme0n1") == {
+        "serial_number": "S4EWNX0R123456",
+        "model": "Samsung SSD 970 EVO Plus 1TB",
+        "firmware": "2B2QEXM7",
+    }
+
+
+def test_identify_reuses_buffers():
+    # the second page must overwrite the first in the same buffers
+    devices = FakeDevices(
+        {
+            "/dev/nvme0n1": NVME_PAGE,
+            "/dev/nvme1n1": make_nvme_page(b"SHORT", b"Other", b"1"),
+        }
+    )
+    engine = make_engine(devices)
+    engine.identify("/dev/nvme0n1")
+    assert engine.identify("/dev/nvme1n1") == {
+        "serial_number": "SHORT",
+        "model": "Other",
+        "firmware": "1",
+    }
+
+
+def test_identify_many_isolates_errors():
+    devices = FakeDevices(
+        {"/dev/sda": ATA_PAGE, "/dev/nvme0n1": NVME_PAGE},
+        # a virtio disk does not support the ATA ioctl, and an NVMe disk may
+        # be busy
+        errors={"/dev/vda": errno.ENOTTY, "/dev/nvme1n1": errno.EBUSY},
+    )
+    paths = [
+        "/dev/sda",
+        "/dev/vda",
+        "/dev/nvme0n1",
+        "/dev/nvme1n1",
+        "/dev/sdz",
+    ]
+    identities = make_engine(devices).identify_many(paths, max_workers=3)
+
+    assert list(identities) == paths
+    assert identities["/dev/sda"]["serial_number"] == "WD-WCC4N7HXYZ12"
+    assert identities["/dev/nvme0n1"]["serial_number"] == "S4EWNX0R123456"
+    assert os.strerror(errno.ENOTTY) in identities["/dev/vda"]["error"]
+    assert "error" in identities["/dev/nvme1n1"]
+    assert "error" in identities["/dev/sdz"]
+
+
+def test_identify_many_closes_devices():
+    devices = FakeDevices(
+        {"/dev/sda": ATA_PAGE}, errors={"/dev/sdb": errno.EIO}
+    )
+    make_engine(devices).identify_many(["/dev/sda", "/dev/sdb"])
+    for fd in devices.paths:
+        with pytest.raises(OSError):
+            os.fstat(fd)
@@ -0,0 +1,81 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT = Path(__file__).resolve().parent.parent
+
+# total import time of `main.py --version`, override with
+# XINCAPIO_IMPORT_BUDGET_MS on slow machines
+IMPORT_BUDGET_MS = float(os.environ.get("XINCAPIO_IMPORT_BUDGET_MS", 200))
+GUI_MODULES = ("PyQt5", "dateutil")
+
+
+def get_import_times(*args):
+    # run main.py under -X importtime and return {module: self time in us}
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", str(PROJECT / "main.py"), *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_time, _, module = line[len("import time:") :].split("|")
+        times[module.strip()] = int(self_time)
+    return times
+
+
+def get_gui_modules(times):
+    return [
+        module
+        for module in times
+        if module.split(".")[0] in GUI_MODULES
+    ]
+
+
+def test_version_does_not_import_gui():
+    times = get_import_times("--version")
+    assert times, "-X importtime printed nothing"
+    assert get_gui_modules(times) == []
+
+
+def test_version_import_time_budget():
+    # the best of a few runs, so that a busy machine does not fail the test
+    totals = [
+        sum(get_import_times("--version").values()) / 1000 for _ in range(3)
+    ]
+    assert min(totals) <= IMPORT_BUDGET_MS, (
+        f"Importing took {min(totals):.1f} ms, "
+        f"the budget is {IMPORT_BUDGET_MS:.1f} ms."
+    )
+
+
+def test_console_does_not_import_gui(tmp_path):
+    times = get_import_times(
+        "--no-cache", "--yes", "--output", str(tmp_path / "output.json")
+    )
+    assert get_gui_modules(times) == []
+    assert (tmp_path / "output.json").exists()
@@ -0,0 +1,119 @@
+# Copyright (C) 2019 Hajun Park
+#
+# This file is part of Xincapio
+#
+# Xincapio is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Xincapio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+# standard library
+import errno
+import json
+import select
+import sys
+from datetime import datetime as dt
+
+# local library
+from style import Style
+
+# wait this long after a notification for the rest of a burst, e.g. a link
+# going down removes all of its addresses one message at a time
+COALESCE_SECONDS = 0.005
+
+
+def watch(my_app):
+    if my_app.my_system != "Linux":
+        print("Watch mode is only supported on Linux.")
+        return
+
+    # local library
+    from linux import netlink, system_info
+
+    groups = (
+        netlink.RTMGRP_LINK
+        | netlink.RTMGRP_IPV4_IFADDR
+        | netlink.RTMGRP_IPV6_IFADDR
+    )
+    # subscribe before taking the first snapshot, so no change is missed
+    with netlink.open_socket(groups) as sock:
+        sock.setblocking(False)
+        epoll = select.epoll()
+        epoll.register(sock.fileno(), select.EPOLLIN)
+
+        previous = my_app.get_info()
+        _emit(previous)
+        try:
+            while True:
+                epoll.poll()
+                while epoll.poll(COALESCE_SECONDS):
+                    _drain(sock)
+                network_info = system_info.get_network_info()
+                # compare like with like, the first snapshot has vendors
+                if my_app.oui is not None:
+                    my_app.oui.enrich(network_info)
+                delta = diff_network(previous.get("network", []), network_info)
+                if delta is None:
+                    continue
+                previous["network"] = network_info
+                previous["creation_time"] = delta["creation_time"]
+                _emit(delta)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            epoll.close()
+
+
+def diff_network(old, new):
+    old_by_name = {network["name"]: network for network in old}
+    new_by_name = {network["name"]: network for network in new}
+    added = [
+        network
+        for name, network in new_by_name.items()
+        if name not in old_by_name
+    ]
+    removed = [
+        network
+        for name, network in old_by_name.items()
+        if name not in new_by_name
+    ]
+    changed = [
+        network
+        for name, network in new_by_name.items()
+        if name in old_by_name and old_by_name[name] != network
+    ]
+    if not (added or removed or changed):
+        return None
+    return {
+        "creation_time": dt.utcnow().strftime(Style.utc_datetime_fmt),
+        "added": added,
+        "removed": removed,
+        "changed": changed,
+    }
+
+
+def _drain(sock):
+    while True:
+        try:
+            if not sock.recv(1 << 16):
+                return
+        except BlockingIOError:
+            return
+        except OSError as error:
+            # the kernel dropped notifications, the next dump resyncs
+            if error.errno != errno.ENOBUFS:
+                raise
+
+
+def _emit(obj):
+    sys.stdout.write(json.dumps(obj) + "\n")
+    sys.stdout.flush()
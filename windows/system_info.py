@@ -20,10 +20,18 @@ import re
 import subprocess
 
 # third party library
+import pythoncom
 import wmi
 
+# local library
+from cache import get_device_key
+from collector import register
 
+
+@register("network", ["Windows"], cache="volatile", timeout=30)
 def get_network_info():
+    # collectors run on worker threads, which need their own COM apartment
+    pythoncom.CoInitialize()
     conn = wmi.WMI()
     interfaces = conn.Win32_NetworkAdapterConfiguration()
     network_info = []
@@ -39,7 +47,15 @@ def get_network_info():
     return network_info
 
 
+@register(
+    "boot_disk",
+    ["Windows"],
+    cache="static",
+    cache_key=lambda: get_device_key("/"),
+    timeout=30,
+)
 def get_disk_info():
+    pythoncom.CoInitialize()
     command = "wmic bootconfig get caption"
     stdoutdata, stderrdata = subprocess.Popen(
         command, stdout=subprocess.PIPE